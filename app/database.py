@@ -12,13 +12,17 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from config import settings
+from app.utils.json_utils import json_dumps, json_loads
 
 # 1. ENGINE: Conexión a la base de datos
 # connect_args solo es necesario para SQLite (permite múltiples threads)
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG  # Si DEBUG=True, imprime todas las queries SQL (útil para aprender)
+    echo=settings.DEBUG,  # Si DEBUG=True, imprime todas las queries SQL (útil para aprender)
+    # Columnas JSON (filtros de búsquedas...) con orjson si está disponible
+    json_serializer=json_dumps,
+    json_deserializer=json_loads
 )
 
 # 2. SESSION: Forma de interactuar con la BD
@@ -60,4 +64,10 @@ def init_db():
     from app import models  # noqa: F401
     
     Base.metadata.create_all(bind=engine)
+    
+    # create_all no añade índices nuevos a tablas que ya existían
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
     print("✅ Base de datos inicializada correctamente")
@@ -11,7 +11,7 @@ Los campos de clase se convierten en columnas de la tabla.
 - Nuevos campos en Settings para notificaciones de errores
 """
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, JSON, Text, Index
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, JSON, Text, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -109,9 +109,21 @@ class Product(Base):
     is_available = Column(Boolean, default=True, nullable=False)
     is_notified = Column(Boolean, default=False, nullable=False)
     is_favorite = Column(Boolean, default=False, nullable=False)
-    found_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    found_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     notified_at = Column(DateTime, nullable=True)
     
+    # --- ÍNDICES ---
+    # Índice parcial para el job que marca como notificados los productos antiguos
+    # (is_notified = false AND found_at < cutoff)
+    __table_args__ = (
+        Index(
+            'ix_products_unnotified_found',
+            'found_at',
+            postgresql_where=text('is_notified = false'),
+            sqlite_where=text('is_notified = 0'),
+        ),
+    )
+    
     # --- RELACIONES ---
     search = relationship("Search", back_populates="products")
     seller = relationship("Seller", back_populates="products")
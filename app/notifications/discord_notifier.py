@@ -148,12 +148,42 @@ class DiscordNotifier:
         }
         return flags.get(country_code, '🌍')
     
-    async def send_product_notification(self, product: Product) -> bool:
+    async def _post_payload(self, session: aiohttp.ClientSession, payload: dict) -> bool:
+        """
+        Envía el payload al webhook, reintentando una vez si hay rate limit.
+        
+        Args:
+            session: Sesión aiohttp a usar
+            payload: Cuerpo JSON del mensaje
+        
+        Returns:
+            bool: True si se envió correctamente
+        """
+        async with session.post(self.webhook_url, json=payload) as response:
+            if response.status == 204:
+                return True
+            elif response.status == 429:
+                # Rate limit - esperar y reintentar
+                retry_after = float(response.headers.get('Retry-After', 1))
+                print(f"[DISCORD] Rate limited, esperando {retry_after}s")
+                await asyncio.sleep(retry_after)
+                
+                # Reintentar una vez
+                async with session.post(self.webhook_url, json=payload) as retry_response:
+                    return retry_response.status == 204
+            else:
+                text = await response.text()
+                print(f"[DISCORD] Error {response.status}: {text}")
+                return False
+    
+    async def send_product_notification(self, product: Product,
+                                        session: Optional[aiohttp.ClientSession] = None) -> bool:
         """
         Envía notificación de un producto a Discord.
         
         Args:
             product: Producto a notificar
+            session: Sesión aiohttp compartida (opcional, se crea una si no se pasa)
         
         Returns:
             bool: True si se envió correctamente
@@ -165,23 +195,11 @@ class DiscordNotifier:
                 "embeds": [embed]
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.webhook_url, json=payload) as response:
-                    if response.status == 204:
-                        return True
-                    elif response.status == 429:
-                        # Rate limit - esperar y reintentar
-                        retry_after = int(response.headers.get('Retry-After', 1))
-                        print(f"[DISCORD] Rate limited, esperando {retry_after}s")
-                        await asyncio.sleep(retry_after)
-                        
-                        # Reintentar una vez
-                        async with session.post(self.webhook_url, json=payload) as retry_response:
-                            return retry_response.status == 204
-                    else:
-                        text = await response.text()
-                        print(f"[DISCORD] Error {response.status}: {text}")
-                        return False
+            if session is not None:
+                return await self._post_payload(session, payload)
+            
+            async with aiohttp.ClientSession() as own_session:
+                return await self._post_payload(own_session, payload)
         
         except Exception as e:
             print(f"[DISCORD] Exception: {e}")
@@ -9,12 +9,29 @@ Soporta:
 """
 
 import asyncio
-from typing import Optional, List, Dict
+from contextlib import AsyncExitStack
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
+
+import aiohttp
 from sqlalchemy.orm import Session
 
 from app.models import Settings, Product, Notification, Search, Seller
 from app.database import SessionLocal
+from app.utils.json_utils import json_dumps
+
+
+# Máximo de envíos simultáneos (producto × canal) para no provocar rate limits
+NOTIFICATION_CONCURRENCY = 20
+
+# Envíos simultáneos máximos a un mismo destino (chat/webhook) por canal:
+# Telegram y Discord limitan por chat/webhook, y con 1 en Telegram los
+# mensajes llegan en orden
+NOTIFICATION_CHANNEL_CONCURRENCY = {
+    'telegram': 1,
+    'discord': 5,
+    'webhook': 5,
+}
 
 
 class NotificationManager:
@@ -97,75 +114,109 @@ class NotificationManager:
         self.db.expire_all()
         self._load_config()
     
-    async def notify_product(self, product: Product) -> Dict[str, bool]:
+    def _active_channels(self) -> List[Tuple[str, object]]:
+        """Devuelve los notificadores activos como pares (canal, notificador)."""
+        channels = (('telegram', self._telegram), ('discord', self._discord), ('webhook', self._webhook))
+        return [(name, notifier) for name, notifier in channels if notifier]
+    
+    def _load_relations(self, product: Product):
+        """Carga search/seller si no vienen ya cargados (los notificadores los usan)."""
+        if not product.search:
+            product.search = self.db.query(Search).filter(Search.id == product.search_id).first()
+        
+        if not product.seller and product.seller_id:
+            product.seller = self.db.query(Seller).filter(Seller.id == product.seller_id).first()
+    
+    async def _dispatch(self, products: List[Product]) -> List[Dict[str, bool]]:
         """
-        Envía notificación de un producto a todos los canales activos.
+        Envía cada producto a cada canal activo de forma concurrente.
+        
+        Cada par (producto, canal) es una corrutina; se lanzan todas con
+        asyncio.gather limitadas por un semáforo global y otro por canal
+        (NOTIFICATION_CHANNEL_CONCURRENCY), con una sesión aiohttp por
+        canal para reutilizar conexiones (payloads codificados con
+        json_dumps). Los registros de Notification y el marcado de
+        is_notified se guardan en un único commit al final.
         
         Args:
-            product: Producto a notificar
+            products: Productos a notificar
         
         Returns:
-            dict: Resultado por canal {'telegram': True, 'discord': False, ...}
+            list: Resultado por canal de cada producto, en el mismo orden
         """
-        results = {}
+        channels = self._active_channels()
         
-        # Cargar relaciones necesarias
-        if not product.search:
-            product.search = self.db.query(Search).filter(Search.id == product.search_id).first()
+        for product in products:
+            self._load_relations(product)
         
-        if not product.seller and product.seller_id:
-            product.seller = self.db.query(Seller).filter(Seller.id == product.seller_id).first()
+        semaphore = asyncio.Semaphore(NOTIFICATION_CONCURRENCY)
+        channel_semaphores = {
+            name: asyncio.Semaphore(NOTIFICATION_CHANNEL_CONCURRENCY.get(name, 1))
+            for name, _ in channels
+        }
         
-        # Enviar a Telegram
-        if self._telegram:
-            try:
-                success = await self._telegram.send_product_notification(product)
-                results['telegram'] = success
-                
-                # Registrar notificación
-                self._log_notification(product.id, 'telegram', 'sent' if success else 'failed')
-                
-            except Exception as e:
-                results['telegram'] = False
-                self._log_notification(product.id, 'telegram', 'failed', str(e))
-        
-        # Enviar a Discord
-        if self._discord:
-            try:
-                success = await self._discord.send_product_notification(product)
-                results['discord'] = success
-                
-                # Registrar notificación
-                self._log_notification(product.id, 'discord', 'sent' if success else 'failed')
-                
-            except Exception as e:
-                results['discord'] = False
-                self._log_notification(product.id, 'discord', 'failed', str(e))
-        
-        # Enviar a Webhook
-        if self._webhook:
-            try:
-                success = await self._webhook.send_product_notification(product)
-                results['webhook'] = success
-                
-                # Registrar notificación
-                self._log_notification(product.id, 'webhook', 'sent' if success else 'failed')
+        async def send(name: str, product: Product, notifier, session: aiohttp.ClientSession) -> bool:
+            async with channel_semaphores[name], semaphore:
+                return await notifier.send_product_notification(product, session=session)
+        
+        async with AsyncExitStack() as stack:
+            sessions = {
+                name: await stack.enter_async_context(aiohttp.ClientSession(json_serialize=json_dumps))
+                for name, _ in channels
+            }
+            
+            sends = [
+                send(name, product, notifier, sessions[name])
+                for product in products
+                for name, notifier in channels
+            ]
+            outcomes = await asyncio.gather(*sends, return_exceptions=True)
+        
+        # Registrar resultados (mismo orden que sends)
+        results = []
+        now = datetime.utcnow()
+        outcome_iter = iter(outcomes)
+        
+        for product in products:
+            product_results = {}
+            
+            for name, _ in channels:
+                outcome = next(outcome_iter)
                 
-            except Exception as e:
-                results['webhook'] = False
-                self._log_notification(product.id, 'webhook', 'failed', str(e))
-        
-        # Marcar producto como notificado si al menos un canal tuvo éxito
-        if any(results.values()):
-            product.is_notified = True
-            product.notified_at = datetime.utcnow()
-            self.db.commit()
+                if isinstance(outcome, BaseException):
+                    product_results[name] = False
+                    self._log_notification(product.id, name, 'failed', str(outcome), commit=False)
+                else:
+                    product_results[name] = bool(outcome)
+                    self._log_notification(product.id, name, 'sent' if outcome else 'failed', commit=False)
+            
+            # Marcar producto como notificado si al menos un canal tuvo éxito
+            if any(product_results.values()):
+                product.is_notified = True
+                product.notified_at = now
+            
+            results.append(product_results)
+        
+        self.db.commit()
         
         return results
     
+    async def notify_product(self, product: Product) -> Dict[str, bool]:
+        """
+        Envía notificación de un producto a todos los canales activos.
+        
+        Args:
+            product: Producto a notificar
+        
+        Returns:
+            dict: Resultado por canal {'telegram': True, 'discord': False, ...}
+        """
+        results = await self._dispatch([product])
+        return results[0]
+    
     async def notify_products(self, products: List[Product]) -> Dict:
         """
-        Envía notificaciones de múltiples productos.
+        Envía notificaciones de múltiples productos (en paralelo).
         
         Args:
             products: Lista de productos a notificar
@@ -173,25 +224,17 @@ class NotificationManager:
         Returns:
             dict: Estadísticas de envío
         """
-        total = len(products)
-        success = 0
-        failed = 0
-        
-        for product in products:
-            results = await self.notify_product(product)
-            
-            if any(results.values()):
-                success += 1
-            else:
-                failed += 1
+        results = await self._dispatch(products)
+        success = sum(1 for product_results in results if any(product_results.values()))
         
         return {
-            'total': total,
+            'total': len(products),
             'success': success,
-            'failed': failed
+            'failed': len(products) - success
         }
     
-    def _log_notification(self, product_id: int, channel: str, status: str, error: Optional[str] = None):
+    def _log_notification(self, product_id: int, channel: str, status: str,
+                          error: Optional[str] = None, commit: bool = True):
         """
         Registra una notificación en la BD.
         
@@ -200,6 +243,7 @@ class NotificationManager:
             channel: Canal usado
             status: Estado (sent, failed)
             error: Mensaje de error (opcional)
+            commit: Hacer commit inmediatamente (False para agrupar varios)
         """
         notification = Notification(
             product_id=product_id,
@@ -209,7 +253,9 @@ class NotificationManager:
         )
         
         self.db.add(notification)
-        self.db.commit()
+        
+        if commit:
+            self.db.commit()
     
     def get_stats(self) -> Dict:
         """
@@ -14,6 +14,10 @@ from typing import Optional
 from app.models import Product
 
 
+# Intentos por mensaje cuando la Bot API responde 429 (se espera retry_after)
+TELEGRAM_MAX_ATTEMPTS = 3
+
+
 class TelegramNotifier:
     """
     Notificador para Telegram.
@@ -104,12 +108,14 @@ class TelegramNotifier:
         }
         return flags.get(country_code, '🌍')
     
-    async def send_product_notification(self, product: Product) -> bool:
+    async def send_product_notification(self, product: Product,
+                                        session: Optional[aiohttp.ClientSession] = None) -> bool:
         """
         Envía notificación de un producto a Telegram.
         
         Args:
             product: Producto a notificar
+            session: Sesión aiohttp compartida (opcional, se crea una si no se pasa)
         
         Returns:
             bool: True si se envió correctamente
@@ -127,52 +133,71 @@ class TelegramNotifier:
                 ]]
             }
             
-            async with aiohttp.ClientSession() as session:
-                # Si hay imagen, enviar foto con caption
-                if product.image_url:
-                    url = f"{self.base_url}/sendPhoto"
-                    
-                    data = {
-                        'chat_id': self.chat_id,
-                        'photo': product.image_url,
-                        'caption': message_text,
-                        'parse_mode': 'HTML',
-                        'reply_markup': keyboard
-                    }
-                    
-                    async with session.post(url, json=data) as response:
-                        result = await response.json()
-                        
-                        if not result.get('ok'):
-                            print(f"[TELEGRAM] Error: {result.get('description')}")
-                            return False
-                        
-                        return True
+            # Si hay imagen, enviar foto con caption
+            if product.image_url:
+                url = f"{self.base_url}/sendPhoto"
                 
-                # Sin imagen, enviar solo mensaje
-                else:
-                    url = f"{self.base_url}/sendMessage"
-                    
-                    data = {
-                        'chat_id': self.chat_id,
-                        'text': message_text,
-                        'parse_mode': 'HTML',
-                        'reply_markup': keyboard
-                    }
-                    
-                    async with session.post(url, json=data) as response:
-                        result = await response.json()
-                        
-                        if not result.get('ok'):
-                            print(f"[TELEGRAM] Error: {result.get('description')}")
-                            return False
-                        
-                        return True
+                data = {
+                    'chat_id': self.chat_id,
+                    'photo': product.image_url,
+                    'caption': message_text,
+                    'parse_mode': 'HTML',
+                    'reply_markup': keyboard
+                }
+            
+            # Sin imagen, enviar solo mensaje
+            else:
+                url = f"{self.base_url}/sendMessage"
+                
+                data = {
+                    'chat_id': self.chat_id,
+                    'text': message_text,
+                    'parse_mode': 'HTML',
+                    'reply_markup': keyboard
+                }
+            
+            if session is not None:
+                return await self._post(session, url, data)
+            
+            async with aiohttp.ClientSession() as own_session:
+                return await self._post(own_session, url, data)
         
         except Exception as e:
             print(f"[TELEGRAM] Exception: {e}")
             return False
     
+    async def _post(self, session: aiohttp.ClientSession, url: str, data: dict) -> bool:
+        """
+        Llama a un método de la Bot API y comprueba la respuesta.
+        
+        Args:
+            session: Sesión aiohttp a usar
+            url: Endpoint de la Bot API
+            data: Cuerpo JSON de la petición
+        
+        Returns:
+            bool: True si Telegram respondió ok
+        """
+        for attempt in range(1, TELEGRAM_MAX_ATTEMPTS + 1):
+            async with session.post(url, json=data) as response:
+                result = await response.json()
+                retry_header = response.headers.get('Retry-After')
+            
+            if result.get('ok'):
+                return True
+            
+            # Rate limit: esperar lo que indica Telegram y reintentar
+            if result.get('error_code') == 429 and attempt < TELEGRAM_MAX_ATTEMPTS:
+                retry_after = (result.get('parameters') or {}).get('retry_after') or retry_header or 1
+                print(f"[TELEGRAM] Rate limited, esperando {retry_after}s")
+                await asyncio.sleep(float(retry_after))
+                continue
+            
+            print(f"[TELEGRAM] Error: {result.get('description')}")
+            return False
+        
+        return False
+    
     async def send_test_message(self) -> bool:
         """
         Envía un mensaje de prueba.
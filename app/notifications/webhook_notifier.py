@@ -89,12 +89,42 @@ class WebhookNotifier:
         
         return payload
     
-    async def send_product_notification(self, product: Product) -> bool:
+    async def _post_payload(self, session: aiohttp.ClientSession, payload: Dict) -> bool:
+        """
+        Hace el POST al webhook con el timeout configurado.
+        
+        Args:
+            session: Sesión aiohttp a usar
+            payload: Cuerpo JSON
+        
+        Returns:
+            bool: True si el webhook respondió 2xx
+        """
+        # Timeout por petición: vale igual con una sesión compartida
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        
+        async with session.post(
+            self.webhook_url,
+            json=payload,
+            headers={'Content-Type': 'application/json'},
+            timeout=timeout
+        ) as response:
+            # Considerar 2xx como éxito
+            if 200 <= response.status < 300:
+                return True
+            else:
+                text = await response.text()
+                print(f"[WEBHOOK] Error {response.status}: {text[:200]}")
+                return False
+    
+    async def send_product_notification(self, product: Product,
+                                        session: Optional[aiohttp.ClientSession] = None) -> bool:
         """
         Envía notificación de un producto al webhook.
         
         Args:
             product: Producto a notificar
+            session: Sesión aiohttp compartida (opcional, se crea una si no se pasa)
         
         Returns:
             bool: True si se envió correctamente
@@ -102,21 +132,11 @@ class WebhookNotifier:
         try:
             payload = self._format_product_payload(product)
             
-            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            if session is not None:
+                return await self._post_payload(session, payload)
             
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    self.webhook_url,
-                    json=payload,
-                    headers={'Content-Type': 'application/json'}
-                ) as response:
-                    # Considerar 2xx como éxito
-                    if 200 <= response.status < 300:
-                        return True
-                    else:
-                        text = await response.text()
-                        print(f"[WEBHOOK] Error {response.status}: {text[:200]}")
-                        return False
+            async with aiohttp.ClientSession() as own_session:
+                return await self._post_payload(own_session, payload)
         
         except asyncio.TimeoutError:
             print(f"[WEBHOOK] Timeout después de {self.timeout}s")
@@ -9,11 +9,13 @@ API Router - Endpoints REST para gestionar búsquedas y productos.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from typing import List, Optional
 from datetime import datetime, timedelta
+from functools import lru_cache
+from pydantic import TypeAdapter
 
 from app.database import get_db
 from app.models import Search, Product, SchedulerLog, ScrapingLog
@@ -21,13 +23,28 @@ from app.schemas import (
     SearchCreate, SearchUpdate, SearchResponse,
     ProductResponse, StatsResponse, MessageResponse,
     SchedulerLogResponse, SchedulerStatusResponse, DetailedStatsResponse,
-    SchedulerStatsResponse
+    SchedulerStatsResponse, fast_construct
 )
 
 # Crear el router con prefijo /api
 router = APIRouter()
 
 
+@lru_cache(maxsize=None)
+def _list_adapter(schema):
+    """TypeAdapter de List[schema], creado una vez por schema."""
+    return TypeAdapter(List[schema])
+
+
+def _fast_list_response(schema, rows) -> Response:
+    """
+    Serializa filas ORM de confianza sin pasar por la validación de
+    response_model (que se mantiene en el decorador para la documentación).
+    """
+    items = [fast_construct(schema, row) for row in rows]
+    return Response(content=_list_adapter(schema).dump_json(items), media_type="application/json")
+
+
 # ============================================================================
 # ENDPOINTS DE BÚSQUEDAS
 # ============================================================================
@@ -51,7 +68,7 @@ async def get_searches(
     for search in searches:
         search.products_count = len(search.products)
     
-    return searches
+    return _fast_list_response(SearchResponse, searches)
 
 
 @router.get("/searches/{search_id}", response_model=SearchResponse)
@@ -260,7 +277,7 @@ async def get_products(
     
     products = query.order_by(Product.found_at.desc()).offset(skip).limit(limit).all()
     
-    return products
+    return _fast_list_response(ProductResponse, products)
 
 
 @router.get("/products/{product_id}", response_model=ProductResponse)
@@ -10,21 +10,38 @@ Task Manager - Gestor de tareas programadas con APScheduler
 """
 
 import time
+import logging
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 import traceback
 
+import requests
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal, get_db
 from app.models import Search, Product, SchedulerLog, Settings
 from app.scraper.main_scraper import VintedScraper
 
+# Notificaciones opcionales (dependen de aiohttp): se importan una sola vez
+try:
+    from app.notifications.notification_manager import NotificationManager
+    from app.notifications.telegram_notifier import TelegramNotifier
+except ImportError:
+    NotificationManager = None
+    TelegramNotifier = None
+
+# Logger del scheduler (handler y formato en app.utils.logging_config)
+logger = logging.getLogger(__name__)
+
+# Tamaño de lote para el UPDATE de productos antiguos como notificados
+MARK_NOTIFIED_BATCH_SIZE = 5000
+
 
 class TaskManager:
     """
@@ -52,17 +69,17 @@ class TaskManager:
         # Diccionario para tracking de errores: {search_id: consecutive_errors}
         self._error_counts: Dict[int, int] = {}
         
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 📅 TaskManager inicializado")
+        logger.info("📅 TaskManager inicializado")
     
     def start(self):
         """
         Inicia el scheduler y carga todas las búsquedas activas.
         """
         if self.scheduler.running:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Scheduler ya está en ejecución")
+            logger.warning("⚠️  Scheduler ya está en ejecución")
             return
         
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 🚀 Iniciando scheduler...")
+        logger.info("🚀 Iniciando scheduler...")
         
         # Cargar búsquedas activas
         self.load_all_searches()
@@ -78,27 +95,27 @@ class TaskManager:
         search_jobs = [j for j in jobs if j.id.startswith('search_')]
         maintenance_jobs = [j for j in jobs if not j.id.startswith('search_')]
         
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Scheduler iniciado")
-        print(f"[{datetime.now().strftime('%H:%M:%S')}]    • {len(search_jobs)} búsquedas activas")
-        print(f"[{datetime.now().strftime('%H:%M:%S')}]    • {len(maintenance_jobs)} jobs de mantenimiento")
+        logger.info("✅ Scheduler iniciado")
+        logger.info(f"   • {len(search_jobs)} búsquedas activas")
+        logger.info(f"   • {len(maintenance_jobs)} jobs de mantenimiento")
         
         # Mostrar próximas ejecuciones
         if search_jobs:
             next_jobs = sorted(search_jobs, key=lambda j: j.next_run_time)[:3]
-            print(f"[{datetime.now().strftime('%H:%M:%S')}]    Próximas ejecuciones:")
+            logger.info("   Próximas ejecuciones:")
             for job in next_jobs:
                 search_id = int(job.id.split('_')[1])
-                print(f"[{datetime.now().strftime('%H:%M:%S')}]      - Búsqueda #{search_id}: {job.next_run_time.strftime('%H:%M:%S')}")
+                logger.info(f"     - Búsqueda #{search_id}: {job.next_run_time.strftime('%H:%M:%S')}")
     
     def stop(self):
         """Detiene el scheduler."""
         if not self.scheduler.running:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Scheduler no está en ejecución")
+            logger.warning("⚠️  Scheduler no está en ejecución")
             return
         
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 🛑 Deteniendo scheduler...")
+        logger.info("🛑 Deteniendo scheduler...")
         self.scheduler.shutdown(wait=True)
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Scheduler detenido")
+        logger.info("✅ Scheduler detenido")
     
     def load_all_searches(self):
         """
@@ -110,12 +127,12 @@ class TaskManager:
             # Obtener búsquedas activas
             searches = db.query(Search).filter(Search.is_active == True).all()
             
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] 📋 Cargando {len(searches)} búsquedas activas...")
+            logger.info(f"📋 Cargando {len(searches)} búsquedas activas...")
             
             for search in searches:
                 self.add_search_job(search)
             
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Búsquedas cargadas")
+            logger.info("✅ Búsquedas cargadas")
         
         finally:
             db.close()
@@ -149,7 +166,7 @@ class TaskManager:
             replace_existing=True
         )
         
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] ➕ Job añadido: {search.name} (cada {search.interval_minutes} min)")
+        logger.info(f"➕ Job añadido: {search.name} (cada {search.interval_minutes} min)")
     
     def remove_search_job(self, search_id: int):
         """
@@ -162,13 +179,13 @@ class TaskManager:
         
         if self.scheduler.get_job(job_id):
             self.scheduler.remove_job(job_id)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ➖ Job eliminado: búsqueda #{search_id}")
+            logger.info(f"➖ Job eliminado: búsqueda #{search_id}")
             
             # Limpiar contador de errores
             if search_id in self._error_counts:
                 del self._error_counts[search_id]
         else:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Job no encontrado: búsqueda #{search_id}")
+            logger.warning(f"⚠️  Job no encontrado: búsqueda #{search_id}")
     
     def pause_search_job(self, search_id: int):
         """Pausa un job de búsqueda."""
@@ -177,9 +194,9 @@ class TaskManager:
         
         if job:
             self.scheduler.pause_job(job_id)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ⏸️  Job pausado: búsqueda #{search_id}")
+            logger.info(f"⏸️  Job pausado: búsqueda #{search_id}")
         else:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Job no encontrado: búsqueda #{search_id}")
+            logger.warning(f"⚠️  Job no encontrado: búsqueda #{search_id}")
     
     def resume_search_job(self, search_id: int):
         """Reanuda un job de búsqueda pausado."""
@@ -188,9 +205,9 @@ class TaskManager:
         
         if job:
             self.scheduler.resume_job(job_id)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ▶️  Job reanudado: búsqueda #{search_id}")
+            logger.info(f"▶️  Job reanudado: búsqueda #{search_id}")
         else:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Job no encontrado: búsqueda #{search_id}")
+            logger.warning(f"⚠️  Job no encontrado: búsqueda #{search_id}")
     
     def run_search_now(self, search_id: int):
         """
@@ -199,7 +216,7 @@ class TaskManager:
         Args:
             search_id: ID de la búsqueda a ejecutar
         """
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚡ Ejecución manual: búsqueda #{search_id}")
+        logger.info(f"⚡ Ejecución manual: búsqueda #{search_id}")
         self._run_search_job(search_id, manual=True)
     
     def _run_search_job(self, search_id: int, manual: bool = False):
@@ -224,8 +241,7 @@ class TaskManager:
             status="running"
         )
         db.add(log)
-        db.commit()
-        db.refresh(log)
+        db.flush()  # Asigna log.id sin el SELECT extra de refresh()
         
         try:
             # Obtener búsqueda
@@ -241,9 +257,9 @@ class TaskManager:
             log.job_name = f"Búsqueda: {search.name}"
             db.commit()
             
-            print(f"\n{'='*80}")
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] 🔄 {'[MANUAL]' if manual else '[AUTO]'} Ejecutando: {search.name}")
-            print(f"{'='*80}")
+            logger.info("=" * 80)
+            logger.info(f"🔄 {'[MANUAL]' if manual else '[AUTO]'} Ejecutando: {search.name}")
+            logger.info("=" * 80)
             
             # Ejecutar scraper
             scraper = VintedScraper(db=db)
@@ -256,28 +272,35 @@ class TaskManager:
             # Calcular duración
             duration_ms = int((time.time() - start_time) * 1000)
             
+            now = datetime.utcnow()
+            
             # ⭐ ACTUALIZAR LOG CON RESULTADOS
             log.status = "success"
-            log.finished_at = datetime.utcnow()
+            log.finished_at = now
             log.duration_ms = duration_ms
             log.products_found = results.get('products_found', 0)
             log.products_new = results.get('products_new', 0)
             log.products_filtered = results.get('products_filtered', 0)
             log.products_notified = results.get('products_notified', 0)
             log.error_count = 0  # Reiniciar contador de errores
+            
+            # Actualizar timestamps de la búsqueda en un solo UPDATE
+            search_values = {'last_run_at': now}
+            if results.get('products_new', 0) > 0:
+                search_values['last_success_at'] = now
+            db.execute(
+                update(Search)
+                .where(Search.id == search_id)
+                .values(**search_values)
+                .execution_options(synchronize_session=False)
+            )
             db.commit()
             
             # Reiniciar contador de errores en memoria
             self._error_counts[search_id] = 0
             
-            # Actualizar timestamps de la búsqueda
-            search.last_run_at = datetime.utcnow()
-            if results.get('products_new', 0) > 0:
-                search.last_success_at = datetime.utcnow()
-            db.commit()
-            
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Job completado exitosamente")
-            print(f"{'='*80}\n")
+            logger.info("✅ Job completado exitosamente")
+            logger.info("=" * 80)
         
         except Exception as e:
             # Calcular duración
@@ -291,8 +314,8 @@ class TaskManager:
             error_msg = str(e)
             error_trace = traceback.format_exc()
             
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ ERROR en job: {error_msg}")
-            print(f"[{datetime.now().strftime('%H:%M:%S')}]    Errores consecutivos: {self._error_counts[search_id]}")
+            logger.error(f"❌ ERROR en job: {error_msg}")
+            logger.error(f"   Errores consecutivos: {self._error_counts[search_id]}")
             
             # ⭐ ACTUALIZAR LOG CON ERROR
             log.status = "error"
@@ -305,7 +328,7 @@ class TaskManager:
             # ⭐ ENVIAR NOTIFICACIÓN DE ERROR SI SE SUPERA EL UMBRAL
             self._check_and_notify_error(search_id, error_msg, db)
             
-            print(f"{'='*80}\n")
+            logger.info("=" * 80)
         
         finally:
             db.close()
@@ -342,7 +365,7 @@ class TaskManager:
                 return
             
             # Enviar notificación
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] 🚨 Enviando notificación de error (umbral alcanzado: {error_count}/{threshold})")
+            logger.warning(f"🚨 Enviando notificación de error (umbral alcanzado: {error_count}/{threshold})")
             
             notification_text = f"""
 🚨 **ALERTA: Búsqueda con errores repetidos**
@@ -354,37 +377,35 @@ class TaskManager:
 La búsqueda ha fallado {error_count} veces consecutivas. Por favor, revisa la configuración.
             """.strip()
             
+            if NotificationManager is None:
+                logger.warning("⚠️  Sistema de notificaciones no disponible")
+                return
+            
             # Intentar enviar por todos los canales disponibles
             try:
-                from app.notifications.notification_manager import NotificationManager
-                nm = NotificationManager(db=db)
-                
                 # Enviar a Telegram si está configurado
                 if settings.telegram_bot_token and settings.telegram_chat_id:
                     try:
-                        from app.notifications.telegram_notifier import TelegramNotifier
                         telegram = TelegramNotifier(
                             bot_token=settings.telegram_bot_token,
                             chat_id=settings.telegram_chat_id
                         )
                         telegram.send_text(notification_text)
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Notificación enviada a Telegram")
+                        logger.info("✅ Notificación enviada a Telegram")
                     except Exception as e:
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error enviando a Telegram: {e}")
+                        logger.error(f"❌ Error enviando a Telegram: {e}")
                 
                 # Enviar a Discord si está configurado
                 if settings.discord_webhook_url:
                     try:
-                        import requests
                         requests.post(settings.discord_webhook_url, json={"content": notification_text})
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Notificación enviada a Discord")
+                        logger.info("✅ Notificación enviada a Discord")
                     except Exception as e:
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error enviando a Discord: {e}")
+                        logger.error(f"❌ Error enviando a Discord: {e}")
                 
                 # Enviar a Webhook genérico si está configurado
                 if settings.webhook_url:
                     try:
-                        import requests
                         requests.post(settings.webhook_url, json={
                             "type": "scheduler_error",
                             "search_id": search_id,
@@ -392,17 +413,15 @@ La búsqueda ha fallado {error_count} veces consecutivas. Por favor, revisa la c
                             "error_count": error_count,
                             "error_message": error_msg
                         })
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Notificación enviada a Webhook")
+                        logger.info("✅ Notificación enviada a Webhook")
                     except Exception as e:
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error enviando a Webhook: {e}")
+                        logger.error(f"❌ Error enviando a Webhook: {e}")
             
-            except ImportError:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Sistema de notificaciones no disponible")
             except Exception as e:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error enviando notificación de error: {e}")
+                logger.error(f"❌ Error enviando notificación de error: {e}")
         
         except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error en _check_and_notify_error: {e}")
+            logger.error(f"❌ Error en _check_and_notify_error: {e}")
     
     def _add_maintenance_jobs(self):
         """
@@ -430,37 +449,45 @@ La búsqueda ha fallado {error_count} veces consecutivas. Por favor, revisa la c
             replace_existing=True
         )
         
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 🔧 Jobs de mantenimiento añadidos")
+        logger.info("🔧 Jobs de mantenimiento añadidos")
+    
+    def _add_log(self, db: Session, started_at: datetime, start_time: float, **fields):
+        """
+        Añade a la sesión un SchedulerLog ya terminado, para guardarlo en el
+        mismo commit que el trabajo del job.
+        
+        Los logs de mantenimiento no necesitan estado "running" ni id inmediato,
+        así que inicio y fin se escriben en una sola fila.
+        """
+        fields.setdefault('status', 'success')
+        db.add(SchedulerLog(
+            started_at=started_at,
+            finished_at=datetime.utcnow(),
+            duration_ms=int((time.time() - start_time) * 1000),
+            **fields
+        ))
     
     def _cleanup_old_products(self):
         """
         ⭐ Job de mantenimiento: Elimina productos antiguos según configuración.
+        
+        Solo guarda SchedulerLog si se eliminó algo o hubo un error.
         """
         db = SessionLocal()
         start_time = time.time()
-        
-        # Crear log
-        log = SchedulerLog(
-            job_id='data_cleanup_daily',
-            job_name='Limpieza diaria de productos antiguos',
-            job_type='cleanup',
-            started_at=datetime.utcnow(),
-            status='running'
-        )
-        db.add(log)
-        db.commit()
-        db.refresh(log)
+        started_at = datetime.utcnow()
+        log_fields = {
+            'job_id': 'data_cleanup_daily',
+            'job_name': 'Limpieza diaria de productos antiguos',
+            'job_type': 'cleanup',
+        }
         
         try:
             # Obtener configuración
             settings = db.query(Settings).first()
             
             if not settings or settings.auto_delete_products_days == 0:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Limpieza automática desactivada")
-                log.status = 'success'
-                log.finished_at = datetime.utcnow()
-                log.duration_ms = int((time.time() - start_time) * 1000)
-                db.commit()
+                logger.warning("⚠️  Limpieza automática desactivada")
                 return
             
             # Calcular fecha límite
@@ -473,38 +500,27 @@ La búsqueda ha fallado {error_count} veces consecutivas. Por favor, revisa la c
             ).count()
             
             if products_to_delete == 0:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ No hay productos antiguos para eliminar")
-                log.status = 'success'
-                log.finished_at = datetime.utcnow()
-                log.duration_ms = int((time.time() - start_time) * 1000)
-                db.commit()
+                logger.info("✅ No hay productos antiguos para eliminar")
                 return
             
             # Eliminar productos
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] 🗑️  Eliminando {products_to_delete} productos más antiguos de {days} días...")
+            logger.info(f"🗑️  Eliminando {products_to_delete} productos más antiguos de {days} días...")
             
             db.query(Product).filter(
                 Product.found_at < cutoff_date
             ).delete()
             
+            # El log va en el mismo commit que el borrado
+            self._add_log(db, started_at, start_time, **log_fields)
             db.commit()
             
             duration_ms = int((time.time() - start_time) * 1000)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ {products_to_delete} productos eliminados en {duration_ms}ms")
-            
-            # Actualizar log
-            log.status = 'success'
-            log.finished_at = datetime.utcnow()
-            log.duration_ms = duration_ms
-            db.commit()
+            logger.info(f"✅ {products_to_delete} productos eliminados en {duration_ms}ms")
         
         except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error en limpieza: {e}")
-            
-            log.status = 'error'
-            log.finished_at = datetime.utcnow()
-            log.duration_ms = int((time.time() - start_time) * 1000)
-            log.error_message = str(e)
+            logger.error(f"❌ Error en limpieza: {e}")
+            db.rollback()
+            self._add_log(db, started_at, start_time, status='error', error_message=str(e), **log_fields)
             db.commit()
         
         finally:
@@ -513,66 +529,63 @@ La búsqueda ha fallado {error_count} veces consecutivas. Por favor, revisa la c
     def _mark_old_products_as_notified(self):
         """
         ⭐ Job de mantenimiento: Marca productos antiguos como notificados.
+        
+        Solo guarda SchedulerLog si se marcó algún producto o hubo un error.
         """
         db = SessionLocal()
         start_time = time.time()
-        
-        # Crear log
-        log = SchedulerLog(
-            job_id='data_mark_notified_periodic',
-            job_name='Marcar productos antiguos como notificados',
-            job_type='maintenance',
-            started_at=datetime.utcnow(),
-            status='running'
-        )
-        db.add(log)
-        db.commit()
-        db.refresh(log)
+        started_at = datetime.utcnow()
+        log_fields = {
+            'job_id': 'data_mark_notified_periodic',
+            'job_name': 'Marcar productos antiguos como notificados',
+            'job_type': 'maintenance',
+        }
         
         try:
             # Obtener configuración
             settings = db.query(Settings).first()
             
             if not settings or settings.auto_mark_notified_hours == 0:
-                log.status = 'success'
-                log.finished_at = datetime.utcnow()
-                log.duration_ms = int((time.time() - start_time) * 1000)
-                db.commit()
+                logger.debug("Marcado automático de notificados desactivado")
                 return
             
             # Calcular fecha límite
             hours = settings.auto_mark_notified_hours
             cutoff_date = datetime.utcnow() - timedelta(hours=hours)
             
-            # Actualizar productos
-            products_updated = db.query(Product).filter(
-                Product.is_notified == False,
-                Product.found_at < cutoff_date
-            ).update({
-                'is_notified': True,
-                'notified_at': datetime.utcnow()
-            })
+            # Actualizar productos por lotes para mantener transacciones cortas
+            notified_at = datetime.utcnow()
+            products_updated = 0
             
-            db.commit()
-            
-            duration_ms = int((time.time() - start_time) * 1000)
+            while True:
+                ids = db.execute(
+                    select(Product.id)
+                    .where(Product.is_notified == False, Product.found_at < cutoff_date)
+                    .limit(MARK_NOTIFIED_BATCH_SIZE)
+                ).scalars().all()
+                
+                if not ids:
+                    break
+                
+                db.execute(
+                    update(Product)
+                    .where(Product.id.in_(ids))
+                    .values(is_notified=True, notified_at=notified_at)
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                products_updated += len(ids)
             
+            # Sin productos afectados no se guarda log (no-op)
             if products_updated > 0:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ {products_updated} productos marcados como notificados")
-            
-            # Actualizar log
-            log.status = 'success'
-            log.finished_at = datetime.utcnow()
-            log.duration_ms = duration_ms
-            db.commit()
+                logger.info(f"✅ {products_updated} productos marcados como notificados")
+                self._add_log(db, started_at, start_time, **log_fields)
+                db.commit()
         
         except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error marcando productos: {e}")
-            
-            log.status = 'error'
-            log.finished_at = datetime.utcnow()
-            log.duration_ms = int((time.time() - start_time) * 1000)
-            log.error_message = str(e)
+            logger.error(f"❌ Error marcando productos: {e}")
+            db.rollback()
+            self._add_log(db, started_at, start_time, status='error', error_message=str(e), **log_fields)
             db.commit()
         
         finally:
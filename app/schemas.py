@@ -12,78 +12,172 @@ Los schemas definen:
 - Schemas para dashboard del scheduler
 """
 
-from pydantic import BaseModel, Field, field_validator, model_validator
-from typing import Optional, List, Dict, Any
+import sys
+from copy import copy
+from functools import lru_cache
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, StringConstraints, create_model, field_validator, model_validator
+from typing import Optional, List, Dict, Literal, Annotated
 from datetime import datetime
 
+from app.utils.url_parser import parse_vinted_url
+
+
+# Longitud máxima de vinted_url (el host lo valida parse_vinted_url contra VINTED_DOMAINS)
+_MAX_VINTED_URL_LENGTH = 4096
+
+
+# Órdenes de resultados aceptados por Vinted
+_VALID_ORDERS = frozenset(('newest_first', 'price_low_to_high', 'price_high_to_low', 'relevance'))
+
+
+# Código de país: dos letras mayúsculas (validado dentro de pydantic-core)
+_CountryCode = Annotated[str, StringConstraints(pattern=r'^[A-Z]{2}$')]
+
+
+def _empty_to_none(v):
+    """Los formularios envían "" para campos vacíos: tratarlos como None."""
+    return None if v == "" else v
+
+
+# Tipos opcionales que aceptan "" como None (campos de formularios de edición)
+_OptFloat = Annotated[Optional[float], BeforeValidator(_empty_to_none)]
+_OptInt = Annotated[Optional[int], BeforeValidator(_empty_to_none)]
+_OptStr = Annotated[Optional[str], BeforeValidator(_empty_to_none)]
+
+
+def _check_order(v: Optional[str]) -> Optional[str]:
+    """Validador compartido del campo 'order' (None se acepta tal cual)."""
+    if v is not None and v not in _VALID_ORDERS:
+        raise ValueError(f'Orden inválido: {v}')
+    return v
+
+
+def _make_update_model(name: str, base: type[BaseModel], doc: str) -> type[BaseModel]:
+    """
+    Genera el schema de actualización a partir de los campos de su *Base.
+    
+    Cada campo pasa a ser Optional con default None, conservando sus
+    restricciones (ge/le, max_length, Literal...).
+    """
+    fields = {}
+    for field_name, field in base.model_fields.items():
+        info = copy(field)
+        info.default = None
+        info.annotation = Optional[field.annotation]
+        fields[field_name] = (Optional[field.annotation], info)
+    return create_model(name, __doc__=doc, __module__=__name__, **fields)
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type[BaseModel]) -> tuple:
+    """Nombres de campos de un schema (internados), calculados una vez por clase."""
+    return tuple(sys.intern(name) for name in cls.model_fields)
+
+
+def fast_construct(cls: type[BaseModel], obj):
+    """
+    Construye un schema de respuesta desde un objeto ORM SIN validar.
+    
+    Solo para datos de confianza (filas de nuestra propia BD): con
+    model_construct se salta pydantic-core por completo.
+    """
+    return cls.model_construct(**{name: getattr(obj, name, None) for name in _field_names(cls)})
+
 
 # ============================================================================
 # SCHEMAS PARA BÚSQUEDAS (SEARCH)
 # ============================================================================
 
+# Descripciones de los campos de búsqueda para el esquema OpenAPI: una sola
+# tabla compartida por SearchBase, SearchCreate, SearchUpdate y SearchResponse
+_SEARCH_FIELD_DESCRIPTIONS = {
+    "name": "Nombre descriptivo de la búsqueda",
+    "query": "Texto de búsqueda en Vinted",
+    "category_ids": "IDs de categorías de Vinted",
+    "brand_ids": "IDs de marcas",
+    "size_ids": "IDs de tallas",
+    "color_ids": "IDs de colores",
+    "material_ids": "IDs de materiales",
+    "platform_ids": "IDs de plataformas de videojuegos",
+    "status_ids": "IDs de estados",
+    "price_from": "Precio mínimo en euros",
+    "price_to": "Precio máximo en euros",
+    "order": "Orden de los resultados",
+    "allowed_countries": "Códigos de países permitidos",
+    "banned_words": "Palabras prohibidas",
+    "banned_seller_ids": "IDs de vendedores bloqueados",
+    "interval_minutes": "Intervalo de ejecución en minutos",
+    "is_active": "Si la búsqueda está activa",
+    "vinted_query_string": "Query string original de Vinted",
+    "vinted_url": "URL de Vinted para extraer parámetros",
+}
+
+
+def _add_search_descriptions(schema: dict) -> None:
+    """json_schema_extra: añade las descripciones a las propiedades existentes."""
+    properties = schema.get('properties', {})
+    for name, description in _SEARCH_FIELD_DESCRIPTIONS.items():
+        if name in properties:
+            properties[name]['description'] = description
+
+
 class SearchBase(BaseModel):
     """Campos base compartidos entre crear y actualizar búsqueda."""
-    name: str = Field(..., min_length=1, max_length=200, description="Nombre descriptivo de la búsqueda")
-    query: Optional[str] = Field(None, max_length=500, description="Texto de búsqueda en Vinted")
+    model_config = ConfigDict(json_schema_extra=_add_search_descriptions)
+    
+    name: str = Field(..., min_length=1, max_length=200)
+    query: Optional[str] = Field(None, max_length=500)
     
     # Filtros de Vinted (todos opcionales)
-    category_ids: Optional[List[int]] = Field(None, description="IDs de categorías de Vinted")
-    brand_ids: Optional[List[int]] = Field(None, description="IDs de marcas")
-    size_ids: Optional[List[int]] = Field(None, description="IDs de tallas")
-    color_ids: Optional[List[int]] = Field(None, description="IDs de colores")
-    material_ids: Optional[List[int]] = Field(None, description="IDs de materiales")
-    platform_ids: Optional[List[int]] = Field(None, description="IDs de plataformas de videojuegos")
-    status_ids: Optional[List[int]] = Field(None, description="IDs de estados")
+    category_ids: Optional[List[int]] = None
+    brand_ids: Optional[List[int]] = None
+    size_ids: Optional[List[int]] = None
+    color_ids: Optional[List[int]] = None
+    material_ids: Optional[List[int]] = None
+    platform_ids: Optional[List[int]] = None
+    status_ids: Optional[List[int]] = None
     
     # Rango de precios
-    price_from: Optional[float] = Field(None, ge=0, description="Precio mínimo en euros")
-    price_to: Optional[float] = Field(None, ge=0, description="Precio máximo en euros")
+    price_from: Optional[float] = Field(None, ge=0)
+    price_to: Optional[float] = Field(None, ge=0)
     
     # Orden de resultados
-    order: str = Field("newest_first", description="Orden de los resultados")
+    order: str = "newest_first"
     
     # Filtros personalizados
-    allowed_countries: Optional[List[str]] = Field(None, description="Códigos de países permitidos")
-    banned_words: Optional[List[str]] = Field(None, description="Palabras prohibidas")
-    banned_seller_ids: Optional[List[str]] = Field(None, description="IDs de vendedores bloqueados")
+    allowed_countries: Optional[List[_CountryCode]] = None
+    banned_words: Optional[List[str]] = None
+    banned_seller_ids: Optional[List[str]] = None
     
     # Configuración
-    interval_minutes: int = Field(5, ge=1, le=1440, description="Intervalo de ejecución en minutos")
-    is_active: bool = Field(True, description="Si la búsqueda está activa")
+    interval_minutes: int = Field(5, ge=1, le=1440)
+    is_active: bool = True
     
-    vinted_query_string: Optional[str] = Field(None, description="Query string original de Vinted")
-    
-    @field_validator('price_to')
-    def validate_price_range(cls, v, info):
-        if v is not None and info.data.get('price_from') is not None:
-            if v < info.data['price_from']:
-                raise ValueError('El precio máximo debe ser mayor que el mínimo')
-        return v
-    
-    @field_validator('allowed_countries')
-    def validate_country_codes(cls, v):
-        if v:
-            for country in v:
-                if not (len(country) == 2 and country.isupper()):
-                    raise ValueError(f'Código de país inválido: {country}')
-        return v
+    vinted_query_string: Optional[str] = None
     
     @field_validator('order')
     def validate_order(cls, v):
-        valid_orders = ['newest_first', 'price_low_to_high', 'price_high_to_low', 'relevance']
-        if v not in valid_orders:
-            raise ValueError(f'Orden inválido: {v}')
-        return v
+        return _check_order(v)
+    
+    def _check_price_range(self):
+        if self.price_from is not None and self.price_to is not None and self.price_to < self.price_from:
+            raise ValueError('El precio máximo debe ser mayor que el mínimo')
+    
+    @model_validator(mode='after')
+    def validate_model(self):
+        self._check_price_range()
+        return self
 
 
 class SearchCreate(SearchBase):
     """Schema para CREAR una nueva búsqueda."""
-    vinted_url: Optional[str] = Field(None, description="URL de Vinted para extraer parámetros")
+    vinted_url: Optional[str] = None
     
-    @model_validator(mode='after')
     def parse_vinted_url_if_provided(self):
         if self.vinted_url:
-            from app.utils.url_parser import parse_vinted_url
+            # Descartar entradas desmesuradas sin llegar al parser
+            if len(self.vinted_url) > _MAX_VINTED_URL_LENGTH:
+                raise ValueError("URL de Vinted inválida")
             try:
                 parsed_params = parse_vinted_url(self.vinted_url)
                 if 'video_game_platform_ids' in parsed_params:
@@ -92,6 +186,12 @@ class SearchCreate(SearchBase):
                     setattr(self, key, value)
             except ValueError as e:
                 raise ValueError(f"Error parseando URL de Vinted: {e}")
+    
+    @model_validator(mode='after')
+    def validate_model(self):
+        # Sustituye al de SearchBase: URL, rango de precios y query en una sola pasada
+        self.parse_vinted_url_if_provided()
+        self._check_price_range()
         
         if not self.query and not (self.price_from or self.price_to):
             raise ValueError("Debe proporcionar al menos un término de búsqueda o rango de precio")
@@ -100,47 +200,38 @@ class SearchCreate(SearchBase):
 
 class SearchUpdate(BaseModel):
     """Schema para ACTUALIZAR una búsqueda existente."""
+    model_config = ConfigDict(json_schema_extra=_add_search_descriptions)
+    
     name: Optional[str] = Field(None, min_length=1, max_length=200)
-    query: Optional[str] = Field(None, max_length=500)
+    query: _OptStr = Field(None, max_length=500)
     category_ids: Optional[List[int]] = None
     brand_ids: Optional[List[int]] = None
     size_ids: Optional[List[int]] = None
     color_ids: Optional[List[int]] = None
     material_ids: Optional[List[int]] = None
     status_ids: Optional[List[int]] = None
-    price_from: Optional[float] = Field(None, ge=0)
-    price_to: Optional[float] = Field(None, ge=0)
+    price_from: _OptFloat = Field(None, ge=0)
+    price_to: _OptFloat = Field(None, ge=0)
     order: Optional[str] = None
     allowed_countries: Optional[List[str]] = None
     banned_words: Optional[List[str]] = None
     banned_seller_ids: Optional[List[str]] = None
-    interval_minutes: Optional[int] = Field(None, ge=1, le=1440)
+    interval_minutes: _OptInt = Field(None, ge=1, le=1440)
     is_active: Optional[bool] = None
     vinted_query_string: Optional[str] = None
     
-    @field_validator('price_from', 'price_to', 'interval_minutes', mode='before')
-    def empty_string_to_none(cls, v):
-        if v == "" or v is None:
-            return None
-        return v
-    
-    @field_validator('query', mode='before')
-    def empty_query_to_none(cls, v):
-        if v == "":
-            return None
-        return v
-    
     @field_validator('order')
     def validate_order(cls, v):
-        if v is not None:
-            valid_orders = ['newest_first', 'price_low_to_high', 'price_high_to_low', 'relevance']
-            if v not in valid_orders:
-                raise ValueError(f'Orden inválido: {v}')
-        return v
+        return _check_order(v)
 
 
 class SearchResponse(SearchBase):
-    """Schema para DEVOLVER una búsqueda (response)."""
+    """
+    Schema para DEVOLVER una búsqueda (response).
+    
+    Los listados lo construyen con fast_construct(): no instanciar desde
+    datos externos por esa vía.
+    """
     id: int
     created_at: datetime
     updated_at: Optional[datetime]
@@ -148,8 +239,7 @@ class SearchResponse(SearchBase):
     last_success_at: Optional[datetime]
     products_count: int = 0
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ============================================================================
@@ -178,8 +268,37 @@ class ProductCreate(ProductBase):
     pass
 
 
+class ProductIngest(BaseModel):
+    """
+    Producto tal como llega de la API de Vinted (uso interno del scraper).
+    
+    Mismos campos que ProductBase sin sus reglas de negocio (precio >= 0...):
+    solo tipos, campos obligatorios y los tamaños de columna de Product, para
+    que un item malo se descarte solo en vez de tumbar el INSERT de la página.
+    No usar para entradas de la API REST (para eso está ProductCreate).
+    """
+    vinted_id: str = Field(..., max_length=100)
+    title: str = Field(..., max_length=500)
+    description: Optional[str] = None
+    price: float
+    currency: str = Field("EUR", max_length=10)
+    brand: Optional[str] = Field(None, max_length=200)
+    size: Optional[str] = Field(None, max_length=50)
+    condition: Optional[str] = Field(None, max_length=100)
+    url: str = Field(..., max_length=1000)
+    image_url: Optional[str] = Field(None, max_length=1000)
+    seller_vinted_id: Optional[str] = Field(None, max_length=100)
+    seller_name: Optional[str] = Field(None, max_length=200)
+    seller_country: Optional[str] = Field(None, max_length=10)
+
+
 class ProductResponse(ProductBase):
-    """Schema para devolver un producto."""
+    """
+    Schema para devolver un producto.
+    
+    Los listados lo construyen con fast_construct(): no instanciar desde
+    datos externos por esa vía.
+    """
     id: int
     search_id: int
     seller_id: Optional[int]
@@ -189,8 +308,7 @@ class ProductResponse(ProductBase):
     found_at: datetime
     notified_at: Optional[datetime]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ============================================================================
@@ -265,8 +383,7 @@ class SellerResponse(SellerBase):
     first_seen_at: datetime
     last_updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ============================================================================
@@ -296,8 +413,16 @@ class SchedulerLogResponse(SchedulerLogBase):
     duration_ms: Optional[int]
     scraping_log_id: Optional[int]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class NextExecution(BaseModel):
+    """Próxima ejecución programada de una búsqueda."""
+    search_id: int
+    job_id: str
+    name: str
+    next_run: Optional[str] = None
+    trigger: str
 
 
 class SchedulerStatusResponse(BaseModel):
@@ -305,7 +430,7 @@ class SchedulerStatusResponse(BaseModel):
     running: bool
     jobs_count: int
     active_searches: int
-    next_executions: List[Dict[str, Any]]
+    next_executions: List[NextExecution]
 
 
 class SchedulerJobInfo(BaseModel):
@@ -332,16 +457,37 @@ class StatsResponse(BaseModel):
     products_today: int
 
 
+class TopSearch(BaseModel):
+    """Búsqueda con más productos encontrados."""
+    search_id: int
+    search_name: str
+    products_count: int
+
+
+class DailyCount(BaseModel):
+    """Productos encontrados en un día (fecha ISO)."""
+    date: str
+    count: int
+
+
 class DetailedStatsResponse(BaseModel):
     """⭐ NUEVO: Estadísticas detalladas."""
     searches: Dict[str, int]
     products: Dict[str, int]
-    top_searches: List[Dict[str, Any]]
+    top_searches: List[TopSearch]
     avg_price: float
-    products_by_day: Optional[List[Dict[str, Any]]] = None
+    products_by_day: Optional[List[DailyCount]] = None
     success_rate: Optional[float] = None
 
 
+class ErrorBySearch(BaseModel):
+    """Errores acumulados de una búsqueda en el scheduler."""
+    search_id: int
+    search_name: str
+    total_errors: int
+    consecutive_errors: int = 0
+
+
 class SchedulerStatsResponse(BaseModel):
     """⭐ NUEVO: Estadísticas del scheduler."""
     total_executions: int
@@ -352,7 +498,7 @@ class SchedulerStatsResponse(BaseModel):
     total_products_found: int
     total_products_new: int
     last_24h_executions: int
-    errors_by_search: List[Dict[str, Any]]
+    errors_by_search: List[ErrorBySearch]
 
 
 # ============================================================================
@@ -374,7 +520,7 @@ class NotificationCreate(NotificationBase):
 
 class NotificationUpdate(BaseModel):
     """Schema para actualizar una notificación."""
-    status: Optional[str] = Field(None, pattern="^(pending|sent|failed)$")
+    status: Optional[Literal["pending", "sent", "failed"]] = None
     error_message: Optional[str] = None
 
 
@@ -383,8 +529,7 @@ class NotificationResponse(NotificationBase):
     id: int
     sent_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ============================================================================
@@ -424,38 +569,13 @@ class SettingsBase(BaseModel):
     scheduler_error_threshold: int = Field(3, ge=1, le=10)
     
     # Preferencias
-    theme: str = Field("light", pattern="^(light|dark)$")
-    language: str = Field("es", pattern="^(es|en|fr|it|pt)$")
-    currency: str = Field("EUR", pattern="^(EUR|USD|GBP)$")
+    theme: Literal["light", "dark"] = "light"
+    language: Literal["es", "en", "fr", "it", "pt"] = "es"
+    currency: Literal["EUR", "USD", "GBP"] = "EUR"
     vinted_domain: str = "vinted.es"
 
 
-class SettingsUpdate(BaseModel):
-    """Schema para actualizar configuración."""
-    push_notifications_enabled: Optional[bool] = None
-    webhook_url: Optional[str] = None
-    telegram_bot_token: Optional[str] = None
-    telegram_chat_id: Optional[str] = None
-    discord_webhook_url: Optional[str] = None
-    discord_bot_token: Optional[str] = None
-    user_agent: Optional[str] = None
-    default_headers: Optional[Dict[str, str]] = None
-    max_products_per_search: Optional[int] = Field(None, ge=1, le=1000)
-    proxies_enabled: Optional[bool] = None
-    proxy_list: Optional[str] = None
-    proxy_rotation: Optional[bool] = None
-    global_banned_words: Optional[str] = None
-    global_min_price: Optional[float] = Field(None, ge=0.0)
-    global_banned_sellers: Optional[str] = None
-    auto_delete_products_days: Optional[int] = Field(None, ge=0)
-    auto_mark_notified_hours: Optional[int] = Field(None, ge=0)
-    max_products_in_db: Optional[int] = Field(None, ge=0)
-    scheduler_error_notifications_enabled: Optional[bool] = None
-    scheduler_error_threshold: Optional[int] = Field(None, ge=1, le=10)
-    theme: Optional[str] = Field(None, pattern="^(light|dark)$")
-    language: Optional[str] = Field(None, pattern="^(es|en|fr|it|pt)$")
-    currency: Optional[str] = Field(None, pattern="^(EUR|USD|GBP)$")
-    vinted_domain: Optional[str] = None
+SettingsUpdate = _make_update_model("SettingsUpdate", SettingsBase, "Schema para actualizar configuración.")
 
 
 class SettingsResponse(SettingsBase):
@@ -464,8 +584,7 @@ class SettingsResponse(SettingsBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ============================================================================
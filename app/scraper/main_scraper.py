@@ -10,10 +10,15 @@ Scraper principal de Vinted - VERSIÓN MEJORADA
 
 import time
 import asyncio
+import logging
 from typing import Optional, List
 from datetime import datetime, timedelta
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
 
 from app.database import SessionLocal
 from app.models import Search, Product, Seller, ScrapingLog
@@ -23,6 +28,33 @@ from app.utils.scraper_config import ScraperConfig
 from app.utils.filter_manager import FilterManager
 
 
+# Logger del scraper (handler y formato en app.utils.logging_config)
+logger = logging.getLogger(__name__)
+
+# Filtros avanzados de Search que se pasan tal cual a scrape_catalog
+SEARCH_FILTER_FIELDS = (
+    "brand_ids", "size_ids", "color_ids", "category_ids",
+    "platform_ids", "material_ids", "status_ids",
+)
+
+# Campos de Seller que no se sobrescriben al refrescar un vendedor
+SELLER_IMMUTABLE_FIELDS = frozenset(('id', 'first_seen_at'))
+
+# Filas por sentencia INSERT al guardar productos nuevos
+PRODUCT_INSERT_BATCH_SIZE = 1000
+
+
+def _insert_ignoring_duplicates(model, dialect_name: str):
+    """
+    INSERT de productos o vendedores que ignora los vinted_id ya existentes,
+    o None si el motor de BD no soporta ON CONFLICT DO NOTHING.
+    """
+    dialect_insert = {'postgresql': postgresql_insert, 'sqlite': sqlite_insert}.get(dialect_name)
+    if dialect_insert is None:
+        return None
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=['vinted_id'])
+
+
 class VintedScraper:
     """
     Scraper principal de Vinted con todas las funcionalidades.
@@ -48,6 +80,10 @@ class VintedScraper:
         self.filter_manager = filter_manager or FilterManager(db=self.db)
         self.requester = VintedRequester(config=self.config, debug=False)
         
+        # Event loop propio y reutilizado (vendedores en paralelo y notificaciones):
+        # el scraper corre en hilos del scheduler, sin loop previo
+        self._loop = asyncio.new_event_loop()
+        
         # Flag para saber si debemos cerrar la BD
         self._own_db = db is None
     
@@ -81,23 +117,23 @@ class VintedScraper:
         self.db.commit()
         self.db.refresh(log)
 
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 🔍 Iniciando scraping para búsqueda: {search.name}")
-        print(f"[{datetime.now().strftime('%H:%M:%S')}]    Query: {search.query}")
-        print(f"[{datetime.now().strftime('%H:%M:%S')}]    Precio: {search.price_from}€ - {search.price_to}€")
+        logger.info("🔍 Iniciando scraping para búsqueda: %s", search.name)
+        logger.info("   Query: %s", search.query)
+        logger.info("   Precio: %s€ - %s€", search.price_from, search.price_to)
         
         # Mostrar configuración de scraping
         config_stats = self.config.get_stats()
-        print(f"[{datetime.now().strftime('%H:%M:%S')}]    User-Agents: {config_stats['user_agents_count']} ({'rotativo' if config_stats['user_agent_rotation'] else 'fijo'})")
+        logger.info("   User-Agents: %s (%s)", config_stats['user_agents_count'], 'rotativo' if config_stats['user_agent_rotation'] else 'fijo')
         if config_stats['proxies_enabled']:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}]    Proxies: {config_stats['proxies_count']} ({'rotativo' if config_stats['proxy_rotation'] else 'fijo'})")
+            logger.info("   Proxies: %s (%s)", config_stats['proxies_count'], 'rotativo' if config_stats['proxy_rotation'] else 'fijo')
         
         # Mostrar configuración de filtros
         filter_stats = self.filter_manager.get_stats()
         if filter_stats['filters_active']:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}]    Filtros: {filter_stats['global_banned_words_count']} palabras, {filter_stats['global_banned_sellers_count']} vendedores, precio mín {filter_stats['global_min_price']}€")
+            logger.info("   Filtros: %s palabras, %s vendedores, precio mín %s€", filter_stats['global_banned_words_count'], filter_stats['global_banned_sellers_count'], filter_stats['global_min_price'])
         
         # PASO 1: SCRAPEAR PRODUCTOS DEL CATÁLOGO
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 📦 Scrapeando productos del catálogo...")
+        logger.info("📦 Scrapeando productos del catálogo...")
         scrape_start = time.time()
         
         try:
@@ -114,20 +150,10 @@ class VintedScraper:
                 }
                 
                 # Añadir filtros avanzados si existen
-                if getattr(search, "brand_ids", None) is not None:
-                    scrape_params["brand_ids"] = search.brand_ids
-                if getattr(search, "size_ids", None) is not None:
-                    scrape_params["size_ids"] = search.size_ids
-                if getattr(search, "color_ids", None) is not None:
-                    scrape_params["color_ids"] = search.color_ids
-                if getattr(search, "category_ids", None) is not None:
-                    scrape_params["category_ids"] = search.category_ids
-                if getattr(search, "platform_ids", None) is not None:
-                    scrape_params["platform_ids"] = search.platform_ids
-                if getattr(search, "material_ids", None) is not None:
-                    scrape_params["material_ids"] = search.material_ids
-                if getattr(search, "status_ids", None) is not None:
-                    scrape_params["status_ids"] = search.status_ids
+                scrape_params.update({
+                    field: value for field in SEARCH_FILTER_FIELDS
+                    if (value := getattr(search, field, None)) is not None
+                })
                 
                 products_data = self.requester.scrape_catalog(**scrape_params)
             
@@ -137,25 +163,25 @@ class VintedScraper:
             # Aplicar límite de configuración
             max_products = self.config.get_max_products()
             if len(products_data) > max_products:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}]    ⚠️  Limitando a {max_products} productos (config)")
+                logger.warning("   ⚠️  Limitando a %s productos (config)", max_products)
                 products_data = products_data[:max_products]
             
             scrape_time = int((time.time() - scrape_start) * 1000)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ {len(products_data)} productos encontrados en {scrape_time}ms")
+            logger.info("✅ %s productos encontrados en %sms", len(products_data), scrape_time)
             
             # Si no hay productos, terminar aquí
             if not products_data:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  No se encontraron productos")
+                logger.warning("⚠️  No se encontraron productos")
                 self._finish_log(log, "success", 0)
                 return self._build_empty_result(start_time)
         
         except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error scrapeando catálogo: {e}")
+            logger.error("❌ Error scrapeando catálogo: %s", e)
             self._finish_log(log, "failed", 0, str(e))
             return self._build_error_result(start_time, str(e))
         
         # PASO 2: APLICAR FILTROS
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 🚫 Aplicando filtros...")
+        logger.info("🚫 Aplicando filtros...")
         filter_start = time.time()
         
         try:
@@ -166,21 +192,20 @@ class VintedScraper:
             
             # Mostrar resultados de filtrado
             if products_rejected > 0:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] 🚫 {products_rejected} productos rechazados por filtros en {filter_time}ms")
+                logger.info("🚫 %s productos rechazados por filtros en %sms", products_rejected, filter_time)
                 
                 # Mostrar top 3 razones de rechazo
-                rejection_reasons = filter_stats_result['rejection_reasons']
-                for reason, count in sorted(rejection_reasons.items(), key=lambda x: x[1], reverse=True)[:3]:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}]    • {reason}: {count} productos")
+                for reason, count in filter_stats_result['rejection_reasons'].most_common(3):
+                    logger.info("   • %s: %s productos", reason, count)
             else:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Todos los productos pasaron filtros ({filter_time}ms)")
+                logger.info("✅ Todos los productos pasaron filtros (%sms)", filter_time)
             
             # Continuar solo con productos aprobados
             products_data = products_filtered
             
             # Si no quedan productos después de filtrar, terminar
             if not products_data:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Todos los productos fueron filtrados")
+                logger.warning("⚠️  Todos los productos fueron filtrados")
                 self._finish_log(log, "success", 0, products_filtered=products_rejected)
                 return {
                     "products_found": filter_stats_result['total'],
@@ -193,126 +218,153 @@ class VintedScraper:
                 }
         
         except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error aplicando filtros: {e}")
+            logger.error("❌ Error aplicando filtros: %s", e)
             # Continuar sin filtrar si hay error
             products_rejected = 0
             filter_stats_result = {'total': len(products_data), 'accepted': len(products_data), 'rejected': 0}
         
         # PASO 3: SCRAPEAR VENDEDORES
-        seller_vinted_ids = list(set(p.seller_vinted_id for p in products_data))
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 👥 Scrapeando {len(seller_vinted_ids)} vendedores únicos...")
+        seller_vinted_ids = list(dict.fromkeys(p.seller_vinted_id for p in products_data))
+        logger.info("👥 Scrapeando %s vendedores únicos...", len(seller_vinted_ids))
         sellers_start = time.time()
         sellers_new = 0
         sellers_updated = 0
         
         # Configuración: actualizar vendedores antiguos
         UPDATE_SELLER_AFTER_DAYS = 1
-        update_threshold = datetime.utcnow() - timedelta(days=UPDATE_SELLER_AFTER_DAYS)
+        # Un único timestamp para todo el paso (umbral y last_updated_at)
+        now = datetime.utcnow()
+        update_threshold = now - timedelta(days=UPDATE_SELLER_AFTER_DAYS)
         
         try:
+            # Vendedores ya guardados: una sola consulta IN
+            existing_sellers = {
+                seller.vinted_id: seller
+                for seller in self.db.query(Seller).filter(Seller.vinted_id.in_(seller_vinted_ids))
+            }
+
+            # Solo se descargan los vendedores nuevos o desactualizados
+            to_fetch = []
             for seller_vinted_id in seller_vinted_ids:
-                try:
-                    # Verificar si ya existe
-                    existing_seller = self.db.query(Seller).filter(
-                        Seller.vinted_id == seller_vinted_id
-                    ).first()
+                existing_seller = existing_sellers.get(seller_vinted_id)
+                last_updated = getattr(existing_seller, "last_updated_at", None) if existing_seller else None
+                if last_updated and last_updated > update_threshold:
+                    continue
+                to_fetch.append(seller_vinted_id)
 
-                    if existing_seller:
-                        # ¿Necesita actualización?
-                        last_updated = getattr(existing_seller, "last_updated_at", None)
-                        if last_updated and last_updated > update_threshold:
-                            continue
+            # Descargar todos en paralelo (aiohttp + semáforo)
+            if to_fetch:
+                logger.info("   📥 Descargando %s vendedores en paralelo...", len(to_fetch))
+            fetched = self._loop.run_until_complete(self.requester.get_sellers_info_async(to_fetch)) if to_fetch else {}
+            new_seller_rows = []
 
-                        # Actualizar vendedor existente
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}]    🔄 Actualizando vendedor {existing_seller.login}...")
-                        seller_data = self.requester.get_seller_info(seller_vinted_id)
+            for seller_vinted_id in to_fetch:
+                try:
+                    existing_seller = existing_sellers.get(seller_vinted_id)
+                    seller_data = fetched.get(seller_vinted_id)
 
-                        if not seller_data:
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}]    ⚠️  Vendedor no disponible")
-                            continue
+                    if not seller_data:
+                        logger.warning("   ⚠️  Vendedor %s no disponible", seller_vinted_id)
+                        continue
 
-                        # Actualizar campos
+                    if existing_seller:
+                        # Actualizar solo los campos que han cambiado (UPDATE más estrecho)
                         for key, value in seller_data.model_dump().items():
-                            if key not in ['id', 'first_seen_at']:
+                            if key not in SELLER_IMMUTABLE_FIELDS and getattr(existing_seller, key, None) != value:
                                 setattr(existing_seller, key, value)
 
-                        setattr(existing_seller, "last_updated_at", datetime.utcnow())
-                        self.db.commit()
+                        setattr(existing_seller, "last_updated_at", now)
                         sellers_updated += 1
                         
-                        rep = getattr(existing_seller, "feedback_reputation", 0.0)
-                        count = getattr(existing_seller, "feedback_count", 0)
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}]    ✅ Actualizado: {existing_seller.login} - {int(rep * 100)}% ({count} valoraciones)")
+                        # Detalle por vendedor solo en DEBUG
+                        if logger.isEnabledFor(logging.DEBUG):
+                            rep = getattr(existing_seller, "feedback_reputation", 0.0)
+                            count = getattr(existing_seller, "feedback_count", 0)
+                            logger.debug("   ✅ Actualizado: %s - %s%% (%s valoraciones)", existing_seller.login, int(rep * 100), count)
 
                     else:
-                        # Scrapear vendedor nuevo
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}]    📥 Scrapeando vendedor {seller_vinted_id}...")
-                        seller_data = self.requester.get_seller_info(seller_vinted_id)
-
-                        if not seller_data:
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}]    ⚠️  Vendedor no disponible")
-                            continue
-
-                        new_seller = Seller(**seller_data.model_dump())
-                        self.db.add(new_seller)
-                        self.db.commit()
-                        self.db.refresh(new_seller)
-                        sellers_new += 1
+                        # Los nuevos se insertan juntos al final (ver abajo)
+                        new_seller_rows.append(seller_data.model_dump())
                         
-                        rep = getattr(new_seller, "feedback_reputation", 0.0)
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}]    ✅ Guardado: {new_seller.login} ({new_seller.country_code}) - {int(rep * 100)}%")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            rep = seller_data.feedback_reputation or 0.0
+                            logger.debug("   ✅ Guardado: %s (%s) - %s%%", seller_data.login, seller_data.country_code, int(rep * 100))
                 
                 except Exception as e:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}]    ❌ Error con vendedor: {e}")
-                    self.db.rollback()
+                    # Los cambios pendientes no se han enviado a la BD: basta con saltar este vendedor
+                    logger.error("   ❌ Error con vendedor: %s", e)
                     continue
 
+            # Altas ignorando los vinted_id que ya existan (p. ej. insertados a la
+            # vez por otro job): un conflicto no deshace al resto de vendedores
+            sellers_new = self._insert_new_sellers(new_seller_rows)
+
+            # Altas y actualizaciones de vendedores en una sola transacción
+            self.db.commit()
+
             sellers_time = int((time.time() - sellers_start) * 1000)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Vendedores procesados ({sellers_new} nuevos, {sellers_updated} actualizados) en {sellers_time}ms")
+            logger.info("✅ Vendedores procesados (%s nuevos, %s actualizados) en %sms", sellers_new, sellers_updated, sellers_time)
 
         except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error procesando vendedores: {e}")
+            logger.error("❌ Error procesando vendedores: %s", e)
             self.db.rollback()
         
         # PASO 4: GUARDAR PRODUCTOS
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 💾 Guardando productos...")
+        logger.info("💾 Guardando productos...")
         save_start = time.time()
         products_new = 0
-        new_products_for_notification: List[Product] = []
+        new_product_ids: List[int] = []
 
         try:
-            for product_data in products_data:
-                # Verificar si ya existe
-                existing = self.db.query(Product).filter(
-                    Product.vinted_id == product_data.vinted_id
-                ).first()
+            # PostgreSQL/SQLite: la BD descarta los duplicados (ON CONFLICT DO NOTHING
+            # sobre el índice único de vinted_id). Otros motores: una consulta IN previa.
+            insert_stmt = _insert_ignoring_duplicates(Product, self.db.get_bind().dialect.name)
+            if insert_stmt is None:
+                insert_stmt = insert(Product)
+                incoming_ids = [p.vinted_id for p in products_data]
+                existing_ids = set(self.db.execute(
+                    select(Product.vinted_id).where(Product.vinted_id.in_(incoming_ids))
+                ).scalars())
+            else:
+                existing_ids = set()
 
-                if existing:
-                    continue
+            # seller_id de cada vendedor: otra única consulta IN y lookup O(1) en el bucle
+            seller_id_map = dict(self.db.execute(
+                select(Seller.vinted_id, Seller.id).where(
+                    Seller.vinted_id.in_({p.seller_vinted_id for p in products_data})
+                )
+            ).all())
 
-                # Buscar seller_id
-                seller = self.db.query(Seller).filter(
-                    Seller.vinted_id == product_data.seller_vinted_id
-                ).first()
+            rows = []
+            for product_data in products_data:
+                # Ya existe (fallback) o viene repetido en esta misma página
+                if product_data.vinted_id in existing_ids:
+                    continue
+                existing_ids.add(product_data.vinted_id)
 
-                # Crear producto con seller_id
-                product_dict = product_data.model_dump()
+                # Crear fila con seller_id (copia directa de los campos: sin serializador)
+                product_dict = dict(product_data.__dict__)
                 product_dict['search_id'] = search.id
-                product_dict['seller_id'] = seller.id if seller else None
+                product_dict['seller_id'] = seller_id_map.get(product_data.seller_vinted_id)
+                rows.append(product_dict)
 
-                new_product = Product(**product_dict)
-                self.db.add(new_product)
-                products_new += 1
-                
-                # Guardar para notificación posterior
-                new_products_for_notification.append(new_product)
+            # Inserción masiva (executemany) por lotes; RETURNING da los IDs de las
+            # filas realmente insertadas (las descartadas por conflicto no aparecen)
+            for i in range(0, len(rows), PRODUCT_INSERT_BATCH_SIZE):
+                new_product_ids.extend(self.db.scalars(
+                    insert_stmt.returning(Product.id),
+                    rows[i:i + PRODUCT_INSERT_BATCH_SIZE]
+                ))
+            # IDs autoincrementales: ordenarlos recupera el orden de inserción
+            new_product_ids.sort()
+            products_new = len(new_product_ids)
 
             self.db.commit()
             save_time = int((time.time() - save_start) * 1000)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ {products_new} productos guardados en {save_time}ms")
+            logger.info("✅ %s productos guardados en %sms", products_new, save_time)
 
         except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error guardando productos: {e}")
+            logger.error("❌ Error guardando productos: %s", e)
             self.db.rollback()
             self._finish_log(log, "failed", 0, str(e))
             return self._build_error_result(start_time, str(e))
@@ -320,8 +372,8 @@ class VintedScraper:
         # PASO 5: ENVIAR NOTIFICACIONES
         products_notified = 0
         
-        if products_new > 0 and new_products_for_notification:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] 📨 Enviando notificaciones...")
+        if products_new > 0 and new_product_ids:
+            logger.info("📨 Enviando notificaciones...")
             notify_start = time.time()
             
             try:
@@ -334,53 +386,50 @@ class VintedScraper:
                 nm_stats = nm.get_stats()
                 
                 if nm_stats['any_active']:
-                    # Refrescar productos para tener IDs y relaciones
-                    products_to_notify = []
-                    for p in new_products_for_notification:
-                        self.db.refresh(p)
-                        products_to_notify.append(p)
+                    # Cargar los productos recién insertados por PK, con sus vendedores
+                    # en una sola consulta extra (los notificadores usan product.seller)
+                    loaded = {
+                        p.id: p
+                        for p in self.db.query(Product)
+                        .options(selectinload(Product.seller))
+                        .filter(Product.id.in_(new_product_ids))
+                    }
+                    products_to_notify = [loaded[pid] for pid in new_product_ids if pid in loaded]
                     
-                    # Enviar notificaciones async
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
+                    # Enviar notificaciones async (en el loop del scraper)
+                    notify_results = self._loop.run_until_complete(nm.notify_products(products_to_notify))
+                    products_notified = notify_results['success']
                     
-                    try:
-                        notify_results = loop.run_until_complete(nm.notify_products(products_to_notify))
-                        products_notified = notify_results['success']
-                        
-                        notify_time = int((time.time() - notify_start) * 1000)
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ {products_notified}/{products_new} notificaciones enviadas en {notify_time}ms")
-                        
-                        # Mostrar canales que enviaron
-                        channels = []
-                        if nm_stats['telegram_active']:
-                            channels.append("📱 Telegram")
-                        if nm_stats['discord_active']:
-                            channels.append("💬 Discord")
-                        if nm_stats['webhook_active']:
-                            channels.append("🌐 Webhook")
-                        
-                        if channels:
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}]    Canales: {', '.join(channels)}")
+                    notify_time = int((time.time() - notify_start) * 1000)
+                    logger.info("✅ %s/%s notificaciones enviadas en %sms", products_notified, products_new, notify_time)
+                    
+                    # Mostrar canales que enviaron
+                    channels = []
+                    if nm_stats['telegram_active']:
+                        channels.append("📱 Telegram")
+                    if nm_stats['discord_active']:
+                        channels.append("💬 Discord")
+                    if nm_stats['webhook_active']:
+                        channels.append("🌐 Webhook")
                     
-                    finally:
-                        loop.close()
+                    if channels:
+                        logger.info("   Canales: %s", ', '.join(channels))
                 
                 else:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  No hay canales de notificación configurados")
+                    logger.warning("⚠️  No hay canales de notificación configurados")
             
             except ImportError:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Sistema de notificaciones no disponible")
+                logger.warning("⚠️  Sistema de notificaciones no disponible")
             except Exception as e:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error enviando notificaciones: {e}")
+                logger.error("❌ Error enviando notificaciones: %s", e)
         
         # ESTADÍSTICAS FINALES
         total_time = int((time.time() - start_time) * 1000)
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 🎉 Scraping completado en {total_time}ms")
-        print(f"[{datetime.now().strftime('%H:%M:%S')}]    📊 Productos: {products_new}/{filter_stats_result['total']} guardados ({products_rejected} filtrados)")
-        print(f"[{datetime.now().strftime('%H:%M:%S')}]    👥 Vendedores: {sellers_new} nuevos, {sellers_updated} actualizados")
+        logger.info("🎉 Scraping completado en %sms", total_time)
+        logger.info("   📊 Productos: %s/%s guardados (%s filtrados)", products_new, filter_stats_result['total'], products_rejected)
+        logger.info("   👥 Vendedores: %s nuevos, %s actualizados", sellers_new, sellers_updated)
         if products_notified > 0:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}]    📨 Notificaciones: {products_notified} enviadas")
+            logger.info("   📨 Notificaciones: %s enviadas", products_notified)
 
         # ⭐ ACTUALIZAR LOG CON TODAS LAS MÉTRICAS
         self._finish_log(
@@ -404,6 +453,37 @@ class VintedScraper:
             "duration_ms": total_time
         }
     
+    def _insert_new_sellers(self, rows: List[dict]) -> int:
+        """
+        Inserta vendedores nuevos ignorando los que ya existan por vinted_id.
+        
+        PostgreSQL/SQLite: un INSERT ... ON CONFLICT DO NOTHING para todos.
+        Otros motores: uno a uno en un SAVEPOINT, descartando los duplicados.
+        
+        Args:
+            rows: Campos de cada vendedor (SellerCreate.model_dump())
+        
+        Returns:
+            int: Vendedores realmente insertados
+        """
+        if not rows:
+            return 0
+        
+        insert_stmt = _insert_ignoring_duplicates(Seller, self.db.get_bind().dialect.name)
+        if insert_stmt is not None:
+            # RETURNING solo devuelve las filas insertadas (no las descartadas)
+            return len(self.db.scalars(insert_stmt.returning(Seller.id), rows).all())
+        
+        inserted = 0
+        for row in rows:
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(Seller), [row])
+                inserted += 1
+            except IntegrityError:
+                logger.debug("   Vendedor %s ya existía", row.get("vinted_id"))
+        return inserted
+    
     def _finish_log(self, log: ScrapingLog, status: str, products_found: int, 
                     error_message: str = None, products_filtered: int = 0,
                     products_notified: int = 0, sellers_new: int = 0,
@@ -455,6 +535,9 @@ class VintedScraper:
             except:
                 pass
         
+        if not self._loop.is_closed():
+            self._loop.close()
+        
         if self._own_db and self.db:
             try:
                 self.db.close()
@@ -494,11 +577,17 @@ def run_search(search_id: int) -> dict:
         finally:
             scraper.close()
 
-        # Actualizar timestamps de la búsqueda
-        setattr(search, "last_run_at", datetime.utcnow())
+        # Actualizar timestamps de la búsqueda en un solo UPDATE
+        now = datetime.utcnow()
+        search_values = {"last_run_at": now, "updated_at": now}
         if results.get("products_new", 0) > 0:
-            setattr(search, "last_success_at", datetime.utcnow())
-        setattr(search, "updated_at", datetime.utcnow())
+            search_values["last_success_at"] = now
+        db.execute(
+            update(Search)
+            .where(Search.id == search_id)
+            .values(**search_values)
+            .execution_options(synchronize_session=False)
+        )
         db.commit()
 
         return results
@@ -8,19 +8,263 @@ Mejoras:
 - Integración con ScraperConfig
 """
 
-import json
+import asyncio
+import aiohttp
 import requests
-import sys
-import os
+import time
+import random
+import threading
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional
 
-# Añadir el directorio raíz al path para imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# dateutil es opcional: isoparse es más rápido que parser.parse para ISO 8601
+# y, sin dateutil, datetime.fromisoformat cubre el formato de Vinted
+try:
+    from dateutil.parser import isoparse as _parse_iso_datetime
+except ImportError:
+    _parse_iso_datetime = datetime.fromisoformat
 
-from app.schemas import ProductCreate, SellerCreate
+from app.schemas import ProductIngest, SellerCreate
 from app.utils.scraper_config import ScraperConfig
+from app.utils.json_utils import json_loads
+
+
+# Peticiones simultáneas máximas al descargar vendedores en paralelo
+SELLER_FETCH_CONCURRENCY = 10
+
+# Segundos que aiohttp cachea la resolución DNS de Vinted (por defecto solo 10)
+ASYNC_DNS_CACHE_TTL_SECONDS = 300
+
+# Caché en memoria de vendedores descargados (compartida por todos los requesters)
+SELLER_CACHE_MAX_SIZE = 4096
+SELLER_CACHE_TTL_SECONDS = 6 * 3600       # Muy por debajo de UPDATE_SELLER_AFTER_DAYS (1 día)
+SELLER_CACHE_MISS_TTL_SECONDS = 3600      # Vendedores inexistentes: reintentar antes
+
+# Estados que indican que el vendedor no existe (se cachean como None). El
+# resto de fallos (429/503 tras los reintentos, timeouts...) son transitorios
+# y no se cachean: la siguiente búsqueda lo vuelve a pedir
+SELLER_NOT_FOUND_STATUS_CODES = frozenset((404,))
+
+
+# Reintentos: estados que se reintentan y backoff exponencial con jitter
+RETRY_STATUS_CODES = frozenset((401, 403, 404, 429, 503))
+RETRY_BACKOFF_BASE_SECONDS = 0.5
+RETRY_BACKOFF_MAX_SECONDS = 30
+
+# Tamaño de la caché de query strings del catálogo (una entrada por búsqueda distinta)
+CATALOG_QUERY_CACHE_SIZE = 1024
+
+# Arrays con corchetes de la URL de Vinted -> nombre esperado por la API
+_VINTED_ARRAY_PARAMS = {
+    "catalog[]": "catalog_ids",
+    "video_game_platform_ids[]": "video_game_platform_ids",
+    "color_ids[]": "color_ids",
+    "brand_ids[]": "brand_ids",
+    "size_ids[]": "size_ids",
+    "material_ids[]": "material_ids",
+    "status_ids[]": "status_ids",
+    "country_ids[]": "country_ids",
+    "city_ids[]": "city_ids",
+    "disposal[]": "is_for_swap",
+}
+
+
+@lru_cache(maxsize=CATALOG_QUERY_CACHE_SIZE)
+def _catalog_query_from_vinted_qs(query_string: str) -> str:
+    """
+    Convierte la query string de una URL de Vinted en la query (ya codificada)
+    de la API de catálogo, sin page/per_page.
+    
+    Args:
+        query_string: Query string original de Vinted
+    
+    Returns:
+        str: Query string codificada
+    """
+    # Agrupar valores por clave en una sola pasada
+    grouped = defaultdict(list)
+    for k, v in parse_qsl(query_string):
+        grouped[k].append(v)
+    
+    # Arrays como string separados por comas
+    params = {
+        _VINTED_ARRAY_PARAMS[k]: ",".join(values)
+        for k, values in grouped.items() if k in _VINTED_ARRAY_PARAMS
+    }
+    
+    # Otros parámetros simples: gana el último valor (page/per_page los pone scrape_catalog)
+    params.update({
+        k: values[-1]
+        for k, values in grouped.items()
+        if k not in _VINTED_ARRAY_PARAMS and k not in ("page", "per_page")
+    })
+    
+    return urlencode(params)
+
+
+@lru_cache(maxsize=CATALOG_QUERY_CACHE_SIZE)
+def _catalog_query_from_filters(filters: tuple) -> str:
+    """
+    Codifica los filtros explícitos de una búsqueda como query de la API.
+    
+    Args:
+        filters: Tupla de pares (clave, valor); los arrays llegan como tuplas
+    
+    Returns:
+        str: Query string codificada, sin page/per_page
+    """
+    params = {}
+    
+    for key, value in filters:
+        if value is None:
+            continue
+        # Arrays como string separados por comas
+        params[key] = ",".join(str(x) for x in value) if isinstance(value, tuple) else value
+    
+    return urlencode(params)
+
+
+def _parse_retry_after(value) -> Optional[float]:
+    """
+    Interpreta la cabecera Retry-After (segundos o fecha HTTP).
+    
+    Args:
+        value: Valor de la cabecera (o None)
+    
+    Returns:
+        float: Segundos a esperar, o None si no hay cabecera válida
+    """
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def compute_backoff(tried: int, retry_after=None) -> float:
+    """
+    Calcula la espera antes del siguiente intento.
+    
+    Respeta Retry-After si el servidor lo manda; si no, backoff exponencial
+    con jitter (base * 2^(intento-1) + aleatorio) para no reintentar todos
+    a la vez.
+    
+    Args:
+        tried: Número del intento que acaba de fallar (empieza en 1)
+        retry_after: Valor de la cabecera Retry-After (opcional)
+    
+    Returns:
+        float: Segundos a esperar (como máximo RETRY_BACKOFF_MAX_SECONDS)
+    """
+    delay = _parse_retry_after(retry_after)
+    
+    if delay is None:
+        delay = RETRY_BACKOFF_BASE_SECONDS * 2 ** (tried - 1) + random.uniform(0, RETRY_BACKOFF_BASE_SECONDS)
+    
+    return min(RETRY_BACKOFF_MAX_SECONDS, delay)
+
+
+def _map_catalog_item(item: dict) -> dict:
+    """
+    Mapea un item de /api/v2/catalog/items a los campos de ProductIngest.
+    
+    Lee price/photo/user una sola vez en lugar de repetir item.get(...) por
+    cada campo. id, title, price y url no llevan valor por defecto: si faltan
+    quedan en None y ProductIngest.model_validate descarta el item.
+    
+    Args:
+        item: Item del JSON del catálogo
+    
+    Returns:
+        dict: Campos de ProductIngest
+    """
+    price = item.get("price") or {}
+    photo = item.get("photo") or {}
+    user = item.get("user") or {}
+    vinted_id = item.get("id")
+    
+    return {
+        "vinted_id": str(vinted_id) if vinted_id is not None else None,
+        "title": item.get("title") or None,
+        "description": item.get("description", ""),
+        "price": price.get("amount"),
+        "currency": price.get("currency_code", "EUR"),
+        "brand": item.get("brand_title", ""),
+        "size": item.get("size_title", ""),
+        "condition": item.get("status", ""),
+        "url": item.get("url") or None,
+        "image_url": photo.get("url", ""),
+        "seller_vinted_id": str(user.get("id", "")),
+        "seller_name": user.get("login", ""),
+        "seller_country": user.get("country_title", ""),
+    }
+
+
+class _SellerCache:
+    """
+    LRU con TTL para respuestas de get_seller_info.
+    
+    El scraper solo pide vendedores nuevos o con last_updated_at de hace
+    más de un día, así que la caché no sustituye a la BD: acierta cuando
+    varias búsquedas piden el mismo vendedor en el mismo ciclo o en pocas
+    horas (jobs en paralelo que leen la BD antes de que el otro guarde, o
+    un job que falla antes del commit) y con los vendedores no disponibles.
+    Por eso el TTL es más corto que la ventana de refresco: con TTL de un
+    día casi nunca acertaría, y así un dato servido desde la caché tiene
+    como mucho unas horas. Thread-safe: el scheduler ejecuta búsquedas en
+    varios hilos.
+    """
+    
+    def __init__(self, max_size: int = SELLER_CACHE_MAX_SIZE):
+        self._max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, seller_id: str):
+        """Devuelve (encontrado, SellerCreate o None)."""
+        with self._lock:
+            entry = self._data.get(seller_id)
+            if entry is None:
+                return False, None
+            expires_at, seller = entry
+            if expires_at < time.monotonic():
+                del self._data[seller_id]
+                return False, None
+            self._data.move_to_end(seller_id)
+            return True, seller
+    
+    def set(self, seller_id: str, seller):
+        """Guarda un resultado (None = vendedor inexistente, con TTL corto)."""
+        ttl = SELLER_CACHE_TTL_SECONDS if seller else SELLER_CACHE_MISS_TTL_SECONDS
+        with self._lock:
+            self._data[seller_id] = (time.monotonic() + ttl, seller)
+            self._data.move_to_end(seller_id)
+            if len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+seller_cache = _SellerCache()
 
 
 class VintedRequester:
@@ -47,6 +291,17 @@ class VintedRequester:
         self.MAX_RETRIES = 3
         self.session = requests.Session()
         
+        # Sin proxies no hace falta tocar session.proxies en cada petición
+        self._proxies_active = self.config.has_proxies()
+        
+        # Pool de conexiones más grande que el por defecto (10): evita descartar
+        # conexiones keep-alive y repetir el handshake TLS en ráfagas de peticiones.
+        # max_retries=0: los reintentos los gestiona get() con backoff
+        pool_maxsize = self.config.get_http_pool_maxsize()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
         # Configurar headers iniciales
         self._update_headers()
         
@@ -58,13 +313,15 @@ class VintedRequester:
     
     def _update_headers(self):
         """Actualiza headers con configuración actual."""
+        # get_headers() puede devolver el dict precalculado de la config
+        # (compartido): no se modifica, el Referer va directo a la sesión
         headers = self.config.get_headers()
         
-        # Añadir Referer basado en el dominio
-        headers['Referer'] = self.VINTED_BASE_URL
-        
         self.session.headers.update(headers)
         
+        # Añadir Referer basado en el dominio
+        self.session.headers['Referer'] = self.VINTED_BASE_URL
+        
         if self.debug:
             print(f"[HEADERS] User-Agent: {headers.get('User-Agent', 'N/A')[:60]}...")
     
@@ -101,7 +358,8 @@ class VintedRequester:
         Returns:
             Response object
         """
-        self._configure_proxy()
+        if self._proxies_active:
+            self._configure_proxy()
         tried = 0
         
         while tried < self.MAX_RETRIES:
@@ -130,13 +388,18 @@ class VintedRequester:
                 
                 response = self.session.get(url, params=params, timeout=10)
                 
-                if response.status_code in (401, 403, 404) and tried < self.MAX_RETRIES:
+                if response.status_code in RETRY_STATUS_CODES and tried < self.MAX_RETRIES:
+                    delay = compute_backoff(tried, response.headers.get("Retry-After"))
+                    
                     if self.debug:
-                        print(f"[ERROR] {response.status_code}, retrying...")
+                        print(f"[ERROR] {response.status_code}, retrying in {delay:.1f}s...")
                     
-                    # Rotar User-Agent en cada reintento
-                    self._update_headers()
-                    self._refresh_cookies()
+                    # Rotar User-Agent en cada reintento (429/503: solo esperar)
+                    if response.status_code not in (429, 503):
+                        self._update_headers()
+                        self._refresh_cookies()
+                    
+                    time.sleep(delay)
                     
                 elif response.status_code == 200:
                     return response
@@ -149,9 +412,11 @@ class VintedRequester:
                     print(f"[ERROR] Request error: {e}")
                 
                 if tried < self.MAX_RETRIES:
-                    # Rotar User-Agent y proxy
+                    # Rotar User-Agent y proxy, y esperar antes de reintentar
                     self._update_headers()
-                    self._configure_proxy()
+                    if self._proxies_active:
+                        self._configure_proxy()
+                    time.sleep(compute_backoff(tried))
                 elif tried == self.MAX_RETRIES:
                     raise HTTPError(f"Failed after {self.MAX_RETRIES} attempts: {e}")
         
@@ -173,7 +438,7 @@ class VintedRequester:
             **extra_filters: Filtros adicionales
         
         Returns:
-            list: Lista de ProductCreate objects
+            list: Lista de ProductIngest objects
         """
         url = f"{self.VINTED_BASE_URL}api/v2/catalog/items"
         
@@ -182,71 +447,32 @@ class VintedRequester:
             per_page = min(self.config.get_max_products(), 96)  # Vinted max = 96
         
         if query_string:
-            # Adaptar la query string al formato esperado por la API
-            from urllib.parse import parse_qsl
-            queries = parse_qsl(query_string)
-            params = {}
-            
-            # Mapeo de arrays con corchetes a nombres esperados por la API
-            array_map = {
-                "catalog[]": "catalog_ids",
-                "video_game_platform_ids[]": "video_game_platform_ids",
-                "color_ids[]": "color_ids",
-                "brand_ids[]": "brand_ids",
-                "size_ids[]": "size_ids",
-                "material_ids[]": "material_ids",
-                "status_ids[]": "status_ids",
-                "country_ids[]": "country_ids",
-                "city_ids[]": "city_ids",
-                "disposal[]": "is_for_swap",
-            }
-            
-            # Agrupar valores (arrays como string separados por comas)
-            for k_api, k_param in array_map.items():
-                values = [v for (k, v) in queries if k == k_api]
-                if values:
-                    params[k_param] = ",".join(values)
-            
-            # Otros parámetros simples
-            for k, v in queries:
-                if k not in array_map:
-                    params[k] = v
-            
-            # page y per_page siempre presentes
-            params["page"] = page
-            params["per_page"] = per_page
+            # Adaptar la query string al formato esperado por la API (cacheado)
+            query = _catalog_query_from_vinted_qs(query_string)
             
             if self.debug:
-                print(f"[DEBUG] Query string adaptada con {len(params)} parámetros")
-            
-            response = self.get(url, params=params)
+                print(f"[DEBUG] Query string adaptada: {query}")
         else:
-            # Parámetros base
-            params = {
-                "page": page,
-                "per_page": per_page
-            }
-            
-            if search_text:
-                params["search_text"] = search_text
-            if price_from is not None:
-                params["price_from"] = price_from
-            if price_to is not None:
-                params["price_to"] = price_to
-            if order:
-                params["order"] = order
-            
-            # Arrays como string separados por comas
-            for key, value in extra_filters.items():
-                if isinstance(value, list):
-                    params[key] = ",".join(str(x) for x in value)
-                else:
-                    params[key] = value
-            
-            response = self.get(url, params=params)
+            # Parámetros base (las listas pasan a tuplas para poder cachear)
+            filters = [
+                ("search_text", search_text or None),
+                ("price_from", price_from),
+                ("price_to", price_to),
+                ("order", order or None),
+            ]
+            filters.extend(
+                (key, tuple(value) if isinstance(value, list) else value)
+                for key, value in extra_filters.items()
+            )
+            query = _catalog_query_from_filters(tuple(filters))
+        
+        # page y per_page siempre presentes (fuera de la caché)
+        paging = f"page={page}&per_page={per_page}"
+        response = self.get(f"{url}?{query}&{paging}" if query else f"{url}?{paging}")
         
         if response.status_code == 200:
-            data = response.json()
+            # Parsear el cuerpo con orjson si está disponible (json estándar si no)
+            data = json_loads(response.content)
             items = data.get("items", [])
             
             if self.debug:
@@ -256,27 +482,12 @@ class VintedRequester:
             
             for item in items:
                 try:
-                    product = ProductCreate(
-                        search_id=1,  # Placeholder, ajusta según búsqueda
-                        vinted_id=str(item.get("id")),
-                        title=item.get("title", ""),
-                        description=item.get("description", ""),
-                        price=float(item.get("price", {}).get("amount", 0)),
-                        currency=item.get("price", {}).get("currency_code", "EUR"),
-                        brand=item.get("brand_title", ""),
-                        size=item.get("size_title", ""),
-                        condition=item.get("status", ""),
-                        url=item.get("url", ""),
-                        image_url=item.get("photo", {}).get("url", "") if item.get("photo") else "",
-                        seller_vinted_id=str(item.get("user", {}).get("id", "")) if item.get("user") else "",
-                        seller_name=item.get("user", {}).get("login", "") if item.get("user") else "",
-                        seller_country=item.get("user", {}).get("country_title", "") if item.get("user") else ""
-                    )
-                    products.append(product)
+                    # Validar cada item: uno malo se descarta sin llegar al INSERT de la página
+                    products.append(ProductIngest.model_validate(_map_catalog_item(item)))
                     
                 except Exception as e:
                     if self.debug:
-                        print(f"[ERROR] Mapeando item: {e}")
+                        print(f"[ERROR] Item {item.get('id')} descartado: {e}")
             
             return products
         else:
@@ -294,80 +505,212 @@ class VintedRequester:
         Returns:
             SellerCreate object o None si falla
         """
+        found, seller = seller_cache.get(seller_id)
+        if found:
+            return seller
+        
         url = f"{self.VINTED_BASE_URL}api/v2/users/{seller_id}"
         
         response = self.get(url)
         
         if response.status_code == 200:
-            data = response.json()
-            user = data.get("user", {})
-            
-            if not user:
-                if self.debug:
-                    print(f"[ERROR] No se encontró info del vendedor {seller_id}")
+            seller = self._parse_seller(seller_id, json_loads(response.content))
+        else:
+            if self.debug:
+                print(f"[ERROR] {response.status_code} obteniendo vendedor {seller_id}")
+            if response.status_code not in SELLER_NOT_FOUND_STATUS_CODES:
+                # Fallo transitorio: no se cachea
                 return None
+            seller = None
+        
+        seller_cache.set(seller_id, seller)
+        return seller
+    
+    async def get_seller_info_async(self, session: aiohttp.ClientSession, seller_id: str):
+        """
+        Versión asíncrona de get_seller_info (mismo resultado).
+        
+        Args:
+            session: Sesión aiohttp compartida entre todas las peticiones
+            seller_id: ID del vendedor en Vinted
+            
+        Returns:
+            SellerCreate object o None si falla
+        """
+        _, seller = await self._fetch_seller_async(session, seller_id)
+        return seller
+    
+    async def _fetch_seller_async(self, session: aiohttp.ClientSession, seller_id: str):
+        """
+        Descarga un vendedor con reintentos.
+        
+        Args:
+            session: Sesión aiohttp compartida entre todas las peticiones
+            seller_id: ID del vendedor en Vinted
+            
+        Returns:
+            tuple: (definitivo, SellerCreate o None). definitivo es False si
+            falló por un error transitorio (no debe cachearse)
+        """
+        url = f"{self.VINTED_BASE_URL}api/v2/users/{seller_id}"
+        status = None
+        
+        for tried in range(1, self.MAX_RETRIES + 1):
+            proxy = self.config.get_proxy()
             
             try:
-                # Parsear verificaciones
-                verification = user.get("verification", {})
-                email_verified = verification.get("email", {}).get("valid", False)
-                facebook_verified = verification.get("facebook", {}).get("valid", False)
-                google_verified = verification.get("google", {}).get("valid", False)
-                
-                # Parsear última actividad
-                last_logged_on = None
-                if user.get("last_loged_on_ts"):
-                    try:
-                        from dateutil import parser
-                        last_logged_on = parser.parse(user.get("last_loged_on_ts"))
-                    except:
-                        last_logged_on = None
-                
-                # Parsear foto
-                photo_url = None
-                if user.get("photo"):
-                    photo_url = user.get("photo", {}).get("url", "")
-                
-                # Crear objeto SellerCreate
-                seller = SellerCreate(
-                    vinted_id=str(user.get("id")),
-                    login=user.get("login", ""),
-                    profile_url=user.get("profile_url", ""),
-                    country_code=user.get("country_code", ""),
-                    country_title=user.get("country_title", ""),
-                    city=user.get("city", ""),
-                    item_count=user.get("item_count", 0),
-                    total_items_count=user.get("total_items_count", 0),
-                    followers_count=user.get("followers_count", 0),
-                    following_count=user.get("following_count", 0),
-                    positive_feedback_count=user.get("positive_feedback_count", 0),
-                    negative_feedback_count=user.get("negative_feedback_count", 0),
-                    neutral_feedback_count=user.get("neutral_feedback_count", 0),
-                    feedback_count=user.get("feedback_count", 0),
-                    feedback_reputation=user.get("feedback_reputation", 0.0),
-                    email_verified=email_verified,
-                    facebook_verified=facebook_verified,
-                    google_verified=google_verified,
-                    is_business=user.get("business", False),
-                    is_banned=user.get("is_account_banned", False),
-                    last_logged_on=last_logged_on,
-                    avg_response_time=user.get("avg_response_time"),
-                    photo_url=photo_url,
-                    about=user.get("about", "")
-                )
-                
-                if self.debug:
-                    print(f"[SUCCESS] Vendedor {seller.login} obtenido")
-                
-                return seller
-                
+                async with session.get(url, proxy=proxy.get('http') if proxy else None) as response:
+                    if response.status == 200:
+                        return True, self._parse_seller(seller_id, await response.json(loads=json_loads))
+                    
+                    status = response.status
+                    if self.debug:
+                        print(f"[ERROR] {response.status} obteniendo vendedor {seller_id} (intento {tried}/{self.MAX_RETRIES})")
+                    
+                    retry_after = response.headers.get("Retry-After")
+            
             except Exception as e:
                 if self.debug:
-                    print(f"[ERROR] Mapeando vendedor: {e}")
-                return None
-        else:
+                    print(f"[ERROR] Request error vendedor {seller_id}: {e}")
+                
+                status = None
+                retry_after = None
+            
+            if tried < self.MAX_RETRIES:
+                await asyncio.sleep(compute_backoff(tried, retry_after))
+        
+        # Solo es definitivo si el último intento confirmó que no existe
+        return status in SELLER_NOT_FOUND_STATUS_CODES, None
+    
+    async def get_sellers_info_async(self, seller_ids, concurrency: int = SELLER_FETCH_CONCURRENCY) -> dict:
+        """
+        Descarga varios vendedores en paralelo con una única sesión aiohttp.
+        
+        Args:
+            seller_ids: IDs de vendedores en Vinted
+            concurrency: Peticiones simultáneas máximas
+            
+        Returns:
+            dict: {seller_id: SellerCreate o None si falla}
+        """
+        results = {}
+        pending = []
+        for seller_id in seller_ids:
+            found, seller = seller_cache.get(seller_id)
+            if found:
+                results[seller_id] = seller
+            else:
+                pending.append(seller_id)
+        
+        if not pending:
+            return results
+        
+        # Reutilizar cabeceras y cookies de la sesión requests
+        if not self.session.cookies:
+            self._refresh_cookies()
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(session, seller_id):
+            async with semaphore:
+                return await self._fetch_seller_async(session, seller_id)
+        
+        # Mismo tamaño de pool que la sesión requests; DNS cacheado entre peticiones
+        connector = aiohttp.TCPConnector(
+            limit=self.config.get_http_pool_maxsize(),
+            ttl_dns_cache=ASYNC_DNS_CACHE_TTL_SECONDS
+        )
+        
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers=dict(self.session.headers),
+            cookies=self.session.cookies.get_dict(),
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as session:
+            fetched = await asyncio.gather(*(fetch(session, seller_id) for seller_id in pending))
+        
+        for seller_id, (definitive, seller) in zip(pending, fetched):
+            if definitive:
+                seller_cache.set(seller_id, seller)
+            results[seller_id] = seller
+        
+        return results
+    
+    def _parse_seller(self, seller_id: str, data: dict):
+        """
+        Mapea la respuesta de /api/v2/users/{id} a SellerCreate.
+        
+        Args:
+            seller_id: ID del vendedor en Vinted
+            data: JSON de la respuesta
+            
+        Returns:
+            SellerCreate object o None si falla
+        """
+        user = data.get("user", {})
+        
+        if not user:
             if self.debug:
-                print(f"[ERROR] {response.status_code} obteniendo vendedor {seller_id}")
+                print(f"[ERROR] No se encontró info del vendedor {seller_id}")
+            return None
+        
+        try:
+            # Parsear verificaciones
+            verification = user.get("verification", {})
+            email_verified = verification.get("email", {}).get("valid", False)
+            facebook_verified = verification.get("facebook", {}).get("valid", False)
+            google_verified = verification.get("google", {}).get("valid", False)
+            
+            # Parsear última actividad
+            last_logged_on = None
+            last_logged_ts = user.get("last_loged_on_ts")
+            if last_logged_ts:
+                try:
+                    last_logged_on = _parse_iso_datetime(last_logged_ts)
+                except (TypeError, ValueError, OverflowError):
+                    last_logged_on = None
+            
+            # Parsear foto
+            photo_url = None
+            if user.get("photo"):
+                photo_url = user.get("photo", {}).get("url", "")
+            
+            # Crear objeto SellerCreate
+            seller = SellerCreate(
+                vinted_id=str(user.get("id")),
+                login=user.get("login", ""),
+                profile_url=user.get("profile_url", ""),
+                country_code=user.get("country_code", ""),
+                country_title=user.get("country_title", ""),
+                city=user.get("city", ""),
+                item_count=user.get("item_count", 0),
+                total_items_count=user.get("total_items_count", 0),
+                followers_count=user.get("followers_count", 0),
+                following_count=user.get("following_count", 0),
+                positive_feedback_count=user.get("positive_feedback_count", 0),
+                negative_feedback_count=user.get("negative_feedback_count", 0),
+                neutral_feedback_count=user.get("neutral_feedback_count", 0),
+                feedback_count=user.get("feedback_count", 0),
+                feedback_reputation=user.get("feedback_reputation", 0.0),
+                email_verified=email_verified,
+                facebook_verified=facebook_verified,
+                google_verified=google_verified,
+                is_business=user.get("business", False),
+                is_banned=user.get("is_account_banned", False),
+                last_logged_on=last_logged_on,
+                avg_response_time=user.get("avg_response_time"),
+                photo_url=photo_url,
+                about=user.get("about", "")
+            )
+            
+            if self.debug:
+                print(f"[SUCCESS] Vendedor {seller.login} obtenido")
+            
+            return seller
+            
+        except Exception as e:
+            if self.debug:
+                print(f"[ERROR] Mapeando vendedor: {e}")
             return None
     
     def close(self):
@@ -379,6 +722,22 @@ class VintedRequester:
 # INSTANCIA SINGLETON (LEGACY - para compatibilidad)
 # ============================================================================
 
-# Esta instancia se mantiene para compatibilidad con código antiguo
-# pero ahora usa la configuración dinámica
-requester = VintedRequester(debug=False)
+@lru_cache(maxsize=1)
+def get_requester() -> VintedRequester:
+    """
+    Devuelve la instancia compartida de VintedRequester (se crea en el primer uso).
+    
+    Importar este módulo ya no abre sesión de BD ni HTTP: solo se hace si
+    alguien pide el requester.
+    
+    Returns:
+        VintedRequester: Instancia compartida
+    """
+    return VintedRequester(debug=False)
+
+
+def __getattr__(name):
+    """Compatibilidad: 'from app.scraper.vinted_client import requester' sigue funcionando."""
+    if name == "requester":
+        return get_requester()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,17 +9,40 @@ Este módulo se encarga de:
 """
 
 import logging
+import sqlite3
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models import Product, Settings
+from sqlalchemy import func, inspect, select
+from app.models import Product, Settings, Notification
 from app.database import SessionLocal
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _has_unique_vinted_id(engine) -> bool:
+    """
+    Comprueba (una vez por engine) si products.vinted_id tiene índice único.
+    
+    Con el índice la BD no admite duplicados y limpiarlos no hace falta. Las
+    BDs antiguas creadas sin él siguen necesitando la limpieza.
+    """
+    inspector = inspect(engine)
+    
+    for index in inspector.get_indexes(Product.__tablename__):
+        if index.get("unique") and index["column_names"] == ["vinted_id"]:
+            return True
+    
+    for constraint in inspector.get_unique_constraints(Product.__tablename__):
+        if constraint["column_names"] == ["vinted_id"]:
+            return True
+    
+    return False
+
+
 class DataManager:
     """
     Gestor de limpieza y mantenimiento de datos.
@@ -35,6 +58,7 @@ class DataManager:
         """
         self.db = db or SessionLocal()
         self._own_db = db is None  # Indica si creamos nuestra propia sesión
+        self._settings_cache: Optional[Settings] = None
     
     def __enter__(self):
         """Context manager entry."""
@@ -42,6 +66,7 @@ class DataManager:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
+        self._settings_cache = None
         if self._own_db:
             self.db.close()
     
@@ -49,9 +74,17 @@ class DataManager:
         """
         Obtiene la configuración actual de la aplicación.
         
+        Se consulta una sola vez por instancia: las tareas de una misma
+        ejecución de mantenimiento comparten una copia de la fila, fuera de
+        la sesión para que los commits de cada tarea no la expiren y
+        obliguen a releerla. Solo lectura.
+        
         Returns:
             Settings: Configuración activa
         """
+        if self._settings_cache is not None:
+            return self._settings_cache
+        
         settings = self.db.query(Settings).filter(Settings.id == 1).first()
         
         if not settings:
@@ -62,16 +95,59 @@ class DataManager:
             self.db.commit()
             self.db.refresh(settings)
         
-        return settings
+        self._settings_cache = Settings(**{
+            column.key: getattr(settings, column.key)
+            for column in Settings.__table__.columns
+        })
+        return self._settings_cache
+    
+    def _count_products(self) -> int:
+        """Cuenta los productos en BD (una sola consulta COUNT)."""
+        return self.db.query(func.count(Product.id)).scalar()
+    
+    def _supports_window_functions(self) -> bool:
+        """Indica si la BD soporta ROW_NUMBER() OVER (SQLite desde 3.25)."""
+        if self.db.get_bind().dialect.name != "sqlite":
+            return True
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    
+    def _bulk_delete_products(self, product_ids) -> int:
+        """
+        Elimina productos con DELETE masivos (sin cargar objetos ORM).
+        
+        El cascade ORM de Product.notifications no se aplica en un DELETE
+        masivo, así que primero se borran sus notificaciones. El SELECT se
+        evalúa una vez por DELETE: si lleva LIMIT, su ORDER BY debe ser total
+        (p. ej. con Product.id de desempate) para que ambos vean los mismos IDs.
+        
+        Args:
+            product_ids: SELECT de los IDs de producto a eliminar
+        
+        Returns:
+            int: Número de productos eliminados
+        """
+        self.db.query(Notification).filter(
+            Notification.product_id.in_(product_ids)
+        ).delete(synchronize_session=False)
+        
+        count = self.db.query(Product).filter(
+            Product.id.in_(product_ids)
+        ).delete(synchronize_session=False)
+        
+        self.db.commit()
+        return count
     
     # ========================================================================
     # TAREAS DIARIAS
     # ========================================================================
     
-    def delete_old_products(self) -> Dict[str, int]:
+    def delete_old_products(self, total_products: Optional[int] = None) -> Dict[str, int]:
         """
         Elimina productos más antiguos según configuración.
         
+        Args:
+            total_products: Total de productos ya contado (opcional, 0 = no hay nada que hacer)
+        
         Returns:
             dict: {'deleted': número de productos eliminados, 'days': días configurados, 'enabled': bool}
         """
@@ -82,36 +158,37 @@ class DataManager:
             logger.info("⏭️  Auto-eliminación de productos antiguos desactivada (days=0)")
             return {"deleted": 0, "days": 0, "enabled": False}
         
+        if total_products == 0:
+            logger.info("✅ No hay productos en BD")
+            return {"deleted": 0, "days": days, "enabled": True}
+        
         # Calcular fecha límite
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        # Buscar productos antiguos
-        old_products = self.db.query(Product).filter(
-            Product.found_at < cutoff_date
-        ).all()
-        
-        count = len(old_products)
+        # Eliminar productos antiguos en la propia BD
+        count = self._bulk_delete_products(
+            select(Product.id).where(Product.found_at < cutoff_date)
+        )
         
         if count == 0:
             logger.info(f"✅ No hay productos más antiguos de {days} días")
             return {"deleted": 0, "days": days, "enabled": True}
         
-        # Eliminar productos
-        for product in old_products:
-            self.db.delete(product)
-        
-        self.db.commit()
-        
         logger.info(f"🗑️  Eliminados {count} productos más antiguos de {days} días")
         return {"deleted": count, "days": days, "enabled": True}
     
-    def apply_database_limit(self) -> Dict[str, int]:
+    def apply_database_limit(self, total_products: Optional[int] = None) -> Dict[str, int]:
         """
         Aplica límite máximo de productos en BD.
         Elimina los más antiguos cuando se supera el límite.
         
+        Args:
+            total_products: Total de productos ya contado (opcional)
+        
         Returns:
-            dict: {'deleted': número de productos eliminados, 'limit': límite configurado, 'total': total actual, 'enabled': bool}
+            dict: {'deleted': número de productos eliminados, 'limit': límite configurado,
+                   'total': total actual, 'enabled': bool}. Sin 'total' si no se
+                   llegó a contar (dentro del límite sin total previo)
         """
         settings = self.get_settings()
         max_products = settings.max_products_in_db
@@ -120,8 +197,16 @@ class DataManager:
             logger.info("⏭️  Límite de productos desactivado (limit=0)")
             return {"deleted": 0, "limit": 0, "total": 0, "enabled": False}
         
-        # Contar productos actuales
-        total_products = self.db.query(Product).count()
+        if total_products is None:
+            # Sin total previo: comprobar si existe la fila max_products+1 (barato)
+            # y solo contar cuando de verdad se supera el límite
+            overflow_row = self.db.query(Product.id).offset(max_products).limit(1).first()
+            
+            if overflow_row is None:
+                logger.info(f"✅ Productos en BD dentro del límite ({max_products})")
+                return {"deleted": 0, "limit": max_products, "enabled": True}
+            
+            total_products = self._count_products()
         
         if total_products <= max_products:
             logger.info(f"✅ Productos en BD ({total_products}) dentro del límite ({max_products})")
@@ -130,16 +215,12 @@ class DataManager:
         # Calcular cuántos hay que eliminar
         to_delete = total_products - max_products
         
-        # Obtener los más antiguos (ordenar por found_at ascendente)
-        old_products = self.db.query(Product).order_by(
-            Product.found_at.asc()
-        ).limit(to_delete).all()
-        
-        # Eliminar productos
-        for product in old_products:
-            self.db.delete(product)
-        
-        self.db.commit()
+        # Eliminar los más antiguos (ordenar por found_at ascendente)
+        to_delete = self._bulk_delete_products(
+            select(Product.id)
+            .order_by(Product.found_at.asc(), Product.id.asc())
+            .limit(to_delete)
+        )
         
         logger.info(
             f"🗑️  Eliminados {to_delete} productos más antiguos "
@@ -147,14 +228,22 @@ class DataManager:
         )
         return {"deleted": to_delete, "limit": max_products, "total": total_products, "enabled": True}
     
-    def clean_duplicate_products(self) -> Dict[str, int]:
+    def clean_duplicate_products(self, total_products: Optional[int] = None) -> Dict[str, int]:
         """
         Elimina productos duplicados (mismo vinted_id).
         Mantiene el más reciente (found_at más nuevo).
         
+        Args:
+            total_products: Total de productos ya contado (opcional, con menos de 2 no hay duplicados)
+        
         Returns:
             dict: {'deleted': número de duplicados eliminados, 'vinted_ids': lista de IDs afectados}
         """
+        # Con índice único en vinted_id (o menos de 2 productos) no puede haber duplicados
+        if (total_products is not None and total_products < 2) or _has_unique_vinted_id(self.db.get_bind()):
+            logger.info("✅ vinted_id es único en BD: no hay duplicados que limpiar")
+            return {"deleted": 0, "vinted_ids": []}
+        
         logger.info("🔍 Buscando productos duplicados...")
         
         # Buscar vinted_ids duplicados
@@ -171,28 +260,26 @@ class DataManager:
             logger.info("✅ No se encontraron productos duplicados")
             return {"deleted": 0, "vinted_ids": []}
         
-        deleted_count = 0
-        affected_vinted_ids = []
-        
-        # Para cada vinted_id duplicado
-        for vinted_id, count in duplicates:
-            # Obtener todos los productos con ese vinted_id
-            products = self.db.query(Product).filter(
-                Product.vinted_id == vinted_id
-            ).order_by(
-                Product.found_at.desc()  # Más reciente primero
-            ).all()
-            
-            # Mantener el primero (más reciente), eliminar el resto
-            to_delete = products[1:]  # Todos menos el primero
-            
-            for product in to_delete:
-                self.db.delete(product)
-                deleted_count += 1
-            
-            affected_vinted_ids.append(vinted_id)
-        
-        self.db.commit()
+        affected_vinted_ids = [vinted_id for vinted_id, _ in duplicates]
+        
+        # Mantener el más reciente de cada vinted_id y eliminar el resto en un solo DELETE
+        if self._supports_window_functions():
+            ranked = select(
+                Product.id,
+                func.row_number().over(
+                    partition_by=Product.vinted_id,
+                    # Más reciente primero; id desempata los found_at iguales
+                    order_by=(Product.found_at.desc(), Product.id.desc())
+                ).label("rn")
+            ).subquery()
+            duplicate_ids = select(ranked.c.id).where(ranked.c.rn > 1)
+        else:
+            # SQLite < 3.25 no tiene ROW_NUMBER(): conservar el de mayor id (el último insertado)
+            duplicate_ids = select(Product.id).where(
+                Product.id.not_in(select(func.max(Product.id)).group_by(Product.vinted_id))
+            )
+        
+        deleted_count = self._bulk_delete_products(duplicate_ids)
         
         logger.info(
             f"🧹 Eliminados {deleted_count} productos duplicados "
@@ -222,14 +309,19 @@ class DataManager:
         }
         
         try:
+            # Contar una vez y descontar lo eliminado por cada tarea
+            total = self._count_products()
+            
             # 1. Eliminar productos antiguos
-            results["old_products_deleted"] = self.delete_old_products()
+            results["old_products_deleted"] = self.delete_old_products(total)
+            total -= results["old_products_deleted"]["deleted"]
             
             # 2. Aplicar límite de BD
-            results["database_limit_applied"] = self.apply_database_limit()
+            results["database_limit_applied"] = self.apply_database_limit(total)
+            total -= results["database_limit_applied"]["deleted"]
             
             # 3. Limpiar duplicados
-            results["duplicates_cleaned"] = self.clean_duplicate_products()
+            results["duplicates_cleaned"] = self.clean_duplicate_products(total)
             
             logger.info("✅ Tareas diarias completadas exitosamente")
             
@@ -243,10 +335,13 @@ class DataManager:
     # TAREAS PERIÓDICAS
     # ========================================================================
     
-    def mark_products_as_notified(self) -> Dict[str, int]:
+    def mark_products_as_notified(self, total_products: Optional[int] = None) -> Dict[str, int]:
         """
         Marca productos como notificados después de X horas.
         
+        Args:
+            total_products: Total de productos ya contado (opcional, 0 = no hay nada que hacer)
+        
         Returns:
             dict: {'marked': número de productos marcados, 'hours': horas configuradas, 'enabled': bool}
         """
@@ -257,27 +352,25 @@ class DataManager:
             logger.info("⏭️  Auto-marcar como notificados desactivado (hours=0)")
             return {"marked": 0, "hours": 0, "enabled": False}
         
+        if total_products == 0:
+            logger.info("✅ No hay productos en BD")
+            return {"marked": 0, "hours": hours, "enabled": True}
+        
         # Calcular fecha límite
         cutoff_date = datetime.utcnow() - timedelta(hours=hours)
         
-        # Buscar productos no notificados y antiguos
-        old_unnotified = self.db.query(Product).filter(
+        # Marcar como notificados los no notificados y antiguos (un solo UPDATE)
+        count = self.db.query(Product).filter(
             Product.is_notified == False,
             Product.found_at < cutoff_date
-        ).all()
+        ).update({Product.is_notified: True}, synchronize_session=False)
         
-        count = len(old_unnotified)
+        self.db.commit()
         
         if count == 0:
             logger.info(f"✅ No hay productos sin notificar más antiguos de {hours} horas")
             return {"marked": 0, "hours": hours, "enabled": True}
         
-        # Marcar como notificados
-        for product in old_unnotified:
-            product.is_notified = True
-        
-        self.db.commit()
-        
         logger.info(f"✅ Marcados {count} productos como notificados (>{hours}h)")
         return {"marked": count, "hours": hours, "enabled": True}
     
@@ -332,13 +425,19 @@ class DataManager:
         }
         
         try:
+            # Contar una vez y descontar lo eliminado por cada tarea
+            total = self._count_products()
+            
             # Ejecutar tareas diarias
-            results["old_products_deleted"] = self.delete_old_products()
-            results["database_limit_applied"] = self.apply_database_limit()
-            results["duplicates_cleaned"] = self.clean_duplicate_products()
+            results["old_products_deleted"] = self.delete_old_products(total)
+            total -= results["old_products_deleted"]["deleted"]
+            results["database_limit_applied"] = self.apply_database_limit(total)
+            total -= results["database_limit_applied"]["deleted"]
+            results["duplicates_cleaned"] = self.clean_duplicate_products(total)
+            total -= results["duplicates_cleaned"]["deleted"]
             
             # Ejecutar tareas periódicas
-            results["products_marked_notified"] = self.mark_products_as_notified()
+            results["products_marked_notified"] = self.mark_products_as_notified(total)
             
             logger.info("✅ Todas las tareas completadas exitosamente")
             
@@ -8,12 +8,39 @@ Aplica filtros configurados en Settings:
 - Filtros personalizados de cada búsqueda
 """
 
-from typing import List, Optional
-from sqlalchemy.orm import Session
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy.orm import Session, load_only
 
 from app.models import Settings, Search
 from app.schemas import ProductCreate
 from app.database import SessionLocal
+from app.utils.settings_helper import parse_lines
+
+
+# Regex compiladas que se guardan (una por lista distinta de palabras/vendedores)
+ALTERNATION_REGEX_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=ALTERNATION_REGEX_CACHE_SIZE)
+def _alternation_regex(words: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    Una sola regex 'a|b|c' (literal) para buscar cualquiera de las palabras, o None.
+    
+    Un solo recorrido del texto por producto, en C, sin importar cuántas
+    palabras haya. Cacheada por tupla de palabras: las búsquedas con la
+    misma lista reutilizan la regex ya compilada entre ejecuciones.
+    """
+    if not words:
+        return None
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+def _accept_all(product: ProductCreate) -> Tuple[bool, Optional[str]]:
+    """Predicado cuando no hay ningún filtro activo: todo producto pasa."""
+    return True, None
 
 
 class FilterManager:
@@ -34,10 +61,15 @@ class FilterManager:
         
         # Cache de configuración
         self._settings: Optional[Settings] = None
-        self._global_banned_words: List[str] = []
-        self._global_banned_sellers: List[str] = []
+        self._global_banned_words: Tuple[str, ...] = ()
+        self._global_banned_sellers: Tuple[str, ...] = ()
         self._global_min_price: float = 0.0
         
+        # Filtros globales compilados (se rehacen en _load_config)
+        self._global_words_re: Optional[re.Pattern] = None
+        self._global_sellers_re: Optional[re.Pattern] = None
+        self._global_seller_ids: frozenset = frozenset()
+        
         # Cargar configuración inicial
         self._load_config()
     
@@ -51,8 +83,10 @@ class FilterManager:
             self.db.close()
     
     def _load_config(self):
-        """Carga la configuración de filtros desde Settings."""
-        self._settings = self.db.query(Settings).filter(Settings.id == 1).first()
+        """Carga la configuración de filtros desde Settings (solo las columnas de filtros)."""
+        self._settings = self.db.query(Settings).options(
+            load_only(Settings.global_banned_words, Settings.global_banned_sellers, Settings.global_min_price)
+        ).filter(Settings.id == 1).first()
         
         if not self._settings:
             # Si no hay settings, no hay filtros
@@ -66,108 +100,149 @@ class FilterManager:
         
         # Obtener precio mínimo global
         self._global_min_price = getattr(self._settings, 'global_min_price', 0.0)
+        
+        # Compilar filtros globales una sola vez
+        self._global_words_re = _alternation_regex(self._global_banned_words)
+        self._global_sellers_re = _alternation_regex(self._global_banned_sellers)
+        self._global_seller_ids = frozenset(self._global_banned_sellers)
     
     def _parse_global_banned_words(self):
         """Parsea la lista de palabras prohibidas globales."""
         banned_words_str = getattr(self._settings, 'global_banned_words', None)
         
-        if banned_words_str:
-            # Separar por líneas y limpiar
-            self._global_banned_words = [
-                word.strip().lower() 
-                for word in banned_words_str.split('\n') 
-                if word.strip()
-            ]
-        else:
-            self._global_banned_words = []
+        # Separar por líneas y limpiar (parseo cacheado por texto)
+        self._global_banned_words = parse_lines(banned_words_str, lowercase=True)
     
     def _parse_global_banned_sellers(self):
         """Parsea la lista de vendedores bloqueados globales."""
         banned_sellers_str = getattr(self._settings, 'global_banned_sellers', None)
         
-        if banned_sellers_str:
-            # Separar por líneas y limpiar
-            self._global_banned_sellers = [
-                seller.strip().lower() 
-                for seller in banned_sellers_str.split('\n') 
-                if seller.strip()
-            ]
-        else:
-            self._global_banned_sellers = []
+        # Separar por líneas y limpiar (parseo cacheado por texto)
+        self._global_banned_sellers = parse_lines(banned_sellers_str, lowercase=True)
     
     def reload(self):
         """Recarga la configuración desde la base de datos."""
         self.db.expire_all()
         self._load_config()
     
-    def filter_product(self, product: ProductCreate, search: Optional[Search] = None) -> tuple[bool, Optional[str]]:
+    @staticmethod
+    def _prepare_search_filters(search: Optional[Search]) -> Optional[dict]:
         """
-        Aplica todos los filtros a un producto.
+        Normaliza los filtros personalizados de una búsqueda una sola vez.
+        
+        Vendedores y países se convierten en frozenset para que cada
+        comprobación por producto sea O(1). Las palabras prohibidas siguen
+        siendo una tupla: se buscan como subcadena dentro del texto.
+        
+        Args:
+            search: Búsqueda asociada (o None)
+        
+        Returns:
+            dict con banned_words, banned_sellers y allowed_countries, o None
+        """
+        if not search:
+            return None
+        
+        search_banned_words = getattr(search, 'banned_words', None) or []
+        if isinstance(search_banned_words, str):
+            search_banned_words = search_banned_words.split('\n')
+        
+        search_banned_sellers = getattr(search, 'banned_seller_ids', None)
+        allowed_countries = getattr(search, 'allowed_countries', None)
+        
+        return {
+            'banned_words': tuple(
+                word.strip().lower() for word in search_banned_words if word and word.strip()
+            ),
+            'banned_sellers': frozenset(search_banned_sellers) if isinstance(search_banned_sellers, list) else frozenset(),
+            'allowed_countries': frozenset(allowed_countries) if isinstance(allowed_countries, list) else frozenset(),
+        }
+    
+    def compile(self, search: Optional[Search] = None) -> Callable[[ProductCreate], Tuple[bool, Optional[str]]]:
+        """
+        Compila todos los filtros en una única función para aplicar por producto.
+        
+        Las listas de palabras/vendedores se convierten en una regex con
+        alternativas (las globales al cargar la configuración, las de la
+        búsqueda desde la caché de _alternation_regex), y vendedores/países
+        en frozensets: el bucle por producto queda sin consultas de
+        configuración ni bucles Python.
         
         Args:
-            product: Producto a filtrar
             search: Búsqueda asociada (para filtros personalizados)
         
         Returns:
-            tuple: (pasa_filtros: bool, razón_rechazo: Optional[str])
-                   Si pasa_filtros=False, razón_rechazo contiene el motivo
+            Función product -> (pasa_filtros, razón_rechazo)
         """
-        # Filtro 1: Precio mínimo global
-        if self._global_min_price > 0 and product.price < self._global_min_price:
-            return False, f"Precio {product.price}€ < mínimo global {self._global_min_price}€"
+        min_price = self._global_min_price or 0.0
+        global_words_re = self._global_words_re
+        global_sellers_re = self._global_sellers_re
+        global_seller_ids = self._global_seller_ids
         
-        # Filtro 2: Palabras prohibidas globales
-        if self._global_banned_words:
-            text_to_check = f"{product.title} {product.description or ''}".lower()
+        search_filters = self._prepare_search_filters(search) or {}
+        search_words_re = _alternation_regex(search_filters.get('banned_words', ()))
+        search_sellers = search_filters.get('banned_sellers', frozenset())
+        allowed_countries = search_filters.get('allowed_countries', frozenset())
+        
+        # Sin filtros configurados (instalación nueva): no hay nada que comprobar
+        if (min_price <= 0 and global_words_re is None and global_sellers_re is None
+                and search_words_re is None and not search_sellers and not allowed_countries):
+            return _accept_all
+        
+        def predicate(product: ProductCreate) -> Tuple[bool, Optional[str]]:
+            # Filtro 1: Precio mínimo global
+            if min_price > 0 and product.price < min_price:
+                return False, f"Precio {product.price}€ < mínimo global {min_price}€"
+            
+            text_to_check = None
             
-            for banned_word in self._global_banned_words:
-                if banned_word in text_to_check:
-                    return False, f"Palabra prohibida: '{banned_word}'"
-        
-        # Filtro 3: Vendedores bloqueados globales
-        if self._global_banned_sellers and product.seller_name:
-            seller_name_lower = product.seller_name.lower()
-            seller_id_lower = product.seller_vinted_id.lower() if product.seller_vinted_id else ""
+            # Filtro 2: Palabras prohibidas globales
+            if global_words_re is not None:
+                text_to_check = f"{product.title} {product.description or ''}".lower()
+                match = global_words_re.search(text_to_check)
+                if match:
+                    return False, f"Palabra prohibida: '{match.group(0)}'"
             
-            for banned_seller in self._global_banned_sellers:
-                if banned_seller in seller_name_lower or banned_seller == seller_id_lower:
+            # Filtro 3: Vendedores bloqueados globales
+            if global_sellers_re is not None and product.seller_name:
+                seller_id_lower = product.seller_vinted_id.lower() if product.seller_vinted_id else ""
+                if global_sellers_re.search(product.seller_name.lower()) or seller_id_lower in global_seller_ids:
                     return False, f"Vendedor bloqueado: '{product.seller_name}'"
-        
-        # Filtros personalizados de la búsqueda (si se pasa)
-        if search:
+            
             # Filtro 4: Palabras prohibidas de la búsqueda
-            search_banned_words = getattr(search, 'banned_words', None)
-            if search_banned_words:
-                banned_words_list = [
-                    word.strip().lower() 
-                    for word in (search_banned_words if isinstance(search_banned_words, list) else search_banned_words.split('\n'))
-                    if word.strip()
-                ] if isinstance(search_banned_words, str) else search_banned_words
-                
-                text_to_check = f"{product.title} {product.description or ''}".lower()
-                
-                for banned_word in banned_words_list:
-                    if banned_word in text_to_check:
-                        return False, f"Palabra prohibida (búsqueda): '{banned_word}'"
+            if search_words_re is not None:
+                if text_to_check is None:
+                    text_to_check = f"{product.title} {product.description or ''}".lower()
+                match = search_words_re.search(text_to_check)
+                if match:
+                    return False, f"Palabra prohibida (búsqueda): '{match.group(0)}'"
             
             # Filtro 5: Vendedores bloqueados de la búsqueda
-            search_banned_sellers = getattr(search, 'banned_seller_ids', None)
-            if search_banned_sellers and product.seller_vinted_id:
-                banned_sellers_list = search_banned_sellers if isinstance(search_banned_sellers, list) else []
-                
-                if product.seller_vinted_id in banned_sellers_list:
-                    return False, f"Vendedor bloqueado (búsqueda): '{product.seller_name}'"
+            if search_sellers and product.seller_vinted_id and product.seller_vinted_id in search_sellers:
+                return False, f"Vendedor bloqueado (búsqueda): '{product.seller_name}'"
             
             # Filtro 6: Países permitidos
-            allowed_countries = getattr(search, 'allowed_countries', None)
-            if allowed_countries and product.seller_country:
-                countries_list = allowed_countries if isinstance(allowed_countries, list) else []
-                
-                if countries_list and product.seller_country not in countries_list:
-                    return False, f"País no permitido: '{product.seller_country}'"
-        
-        # Producto pasa todos los filtros
-        return True, None
+            if allowed_countries and product.seller_country and product.seller_country not in allowed_countries:
+                return False, f"País no permitido: '{product.seller_country}'"
+            
+            # Producto pasa todos los filtros
+            return True, None
+        
+        return predicate
+    
+    def filter_product(self, product: ProductCreate, search: Optional[Search] = None) -> tuple[bool, Optional[str]]:
+        """
+        Aplica todos los filtros a un producto.
+        
+        Args:
+            product: Producto a filtrar
+            search: Búsqueda asociada (para filtros personalizados)
+        
+        Returns:
+            tuple: (pasa_filtros: bool, razón_rechazo: Optional[str])
+                   Si pasa_filtros=False, razón_rechazo contiene el motivo
+        """
+        return self.compile(search)(product)
     
     def filter_products(self, products: List[ProductCreate], search: Optional[Search] = None) -> tuple[List[ProductCreate], dict]:
         """
@@ -179,26 +254,36 @@ class FilterManager:
         
         Returns:
             tuple: (productos_filtrados: List[ProductCreate], estadísticas: dict)
+                   (rejection_reasons es un Counter razón -> número de productos)
         """
+        # Compilar los filtros una vez para toda la lista
+        predicate = self.compile(search)
+        
+        if predicate is _accept_all:
+            return list(products), {
+                'total': len(products),
+                'accepted': len(products),
+                'rejected': 0,
+                'rejection_reasons': Counter()
+            }
+        
         filtered = []
-        rejected = []
-        rejection_reasons = {}
         
+        # Solo se guardan las razones; el recuento se hace de una vez con Counter
+        reasons = []
         for product in products:
-            passes, reason = self.filter_product(product, search)
+            passes, reason = predicate(product)
             
             if passes:
                 filtered.append(product)
             else:
-                rejected.append(product)
-                # Contar razones de rechazo
-                rejection_reasons[reason] = rejection_reasons.get(reason, 0) + 1
+                reasons.append(reason)
         
         stats = {
             'total': len(products),
             'accepted': len(filtered),
-            'rejected': len(rejected),
-            'rejection_reasons': rejection_reasons
+            'rejected': len(reasons),
+            'rejection_reasons': Counter(reasons)
         }
         
         return filtered, stats
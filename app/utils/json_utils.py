@@ -0,0 +1,48 @@
+"""
+Serialización JSON de la aplicación.
+
+orjson es opcional: si está instalado se usa su codificador en C (bastante
+más rápido en dicts anidados); si no, se recurre al módulo json estándar.
+
+Se usa en:
+- Columnas JSON de SQLAlchemy (filtros de búsquedas, configuración)
+- Payloads de notificaciones (sesiones aiohttp compartidas)
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(obj) -> str:
+    """
+    Serializa un objeto a JSON (str).
+
+    Args:
+        obj: Objeto serializable
+
+    Returns:
+        str: JSON
+    """
+    if orjson is not None:
+        # OPT_NON_STR_KEYS: json.dumps también acepta claves int
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+def json_loads(data):
+    """
+    Deserializa JSON (str o bytes).
+
+    Args:
+        data: JSON
+
+    Returns:
+        Objeto Python
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,39 @@
+"""
+Configuración de logging de la aplicación.
+
+Todos los módulos usan logging.getLogger(__name__) (loggers hijos de 'app')
+y este módulo configura una sola vez el handler común:
+
+    [HH:MM:SS] mensaje
+
+El timestamp lo genera el Formatter solo cuando el mensaje se emite.
+"""
+
+import sys
+import logging
+
+
+LOG_FORMAT = '[%(asctime)s] %(message)s'
+LOG_DATE_FORMAT = '%H:%M:%S'
+
+
+def configure_logging(level: int = logging.INFO) -> logging.Logger:
+    """
+    Configura el logger raíz de la aplicación ('app'). Idempotente.
+
+    Args:
+        level: Nivel mínimo (DEBUG muestra también el detalle por vendedor)
+
+    Returns:
+        logging.Logger: El logger 'app'
+    """
+    app_logger = logging.getLogger('app')
+
+    if not app_logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+        app_logger.addHandler(handler)
+        app_logger.propagate = False
+
+    app_logger.setLevel(level)
+    return app_logger
@@ -9,11 +9,37 @@ Gestiona la configuración del scraper desde Settings:
 """
 
 import random
-from typing import Optional, List, Dict
-from sqlalchemy.orm import Session
+from itertools import cycle
+from typing import Optional, Dict, Tuple
+from sqlalchemy.orm import Session, load_only
 
 from app.models import Settings
 from app.database import SessionLocal
+from app.utils.settings_helper import parse_lines
+
+
+# Conexiones HTTP reutilizables por host en la sesión del requester
+HTTP_POOL_MAXSIZE = 32
+
+# Columnas de Settings que usa el scraper (el resto no se carga)
+_SCRAPER_SETTINGS_COLUMNS = (
+    Settings.user_agent,
+    Settings.user_agent_list,
+    Settings.user_agent_rotation,
+    Settings.default_headers,
+    Settings.proxies_enabled,
+    Settings.proxy_list,
+    Settings.proxy_rotation,
+    Settings.max_products_per_search,
+    Settings.vinted_domain,
+)
+
+# Headers fijos de todas las peticiones (el User-Agent se añade en cada llamada)
+_BASE_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
+    "X-Requested-With": "XMLHttpRequest"
+}
 
 
 class ScraperConfig:
@@ -34,12 +60,12 @@ class ScraperConfig:
         
         # Cache de configuración
         self._settings: Optional[Settings] = None
-        self._user_agents: List[str] = []
-        self._proxies: List[str] = []
+        self._user_agents: Tuple[str, ...] = ()
+        self._proxies: Tuple[str, ...] = ()
         
-        # Índices para rotación
-        self._user_agent_index = 0
-        self._proxy_index = 0
+        # Iteradores de rotación (se rehacen en cada carga de configuración)
+        self._user_agent_cycle = None
+        self._proxy_cycle = None
         
         # Cargar configuración inicial
         self._load_config()
@@ -54,8 +80,8 @@ class ScraperConfig:
             self.db.close()
     
     def _load_config(self):
-        """Carga la configuración desde Settings."""
-        self._settings = self.db.query(Settings).filter(Settings.id == 1).first()
+        """Carga la configuración desde Settings (solo las columnas del scraper)."""
+        self._settings = self.db.query(Settings).options(load_only(*_SCRAPER_SETTINGS_COLUMNS)).filter(Settings.id == 1).first()
         
         if not self._settings:
             # Crear configuración por defecto si no existe
@@ -64,53 +90,68 @@ class ScraperConfig:
             self.db.commit()
             self.db.refresh(self._settings)
         
+        # Valores simples copiados una vez: leerlos del objeto ORM en cada
+        # petición pasa por la instrumentación y, si la sesión ha hecho commit
+        # entretanto (objeto expirado), lanza un SELECT de refresco
+        settings = self._settings
+        self._user_agent_rotation = getattr(settings, 'user_agent_rotation', True)
+        self._proxies_enabled = getattr(settings, 'proxies_enabled', False)
+        self._proxy_rotation = getattr(settings, 'proxy_rotation', True)
+        self._max_products = getattr(settings, 'max_products_per_search', 100)
+        self._vinted_domain = getattr(settings, 'vinted_domain', 'vinted.es')
+        self._has_custom_headers = bool(getattr(settings, 'default_headers', None))
+        
         # Parsear User-Agents
         self._parse_user_agents()
         
         # Parsear Proxies
         self._parse_proxies()
+        
+        # Precalcular lo que no cambia entre peticiones (se rehace en reload)
+        additional_headers = getattr(self._settings, 'default_headers', None)
+        self._extra_headers = additional_headers if isinstance(additional_headers, dict) else {}
+        self._static_headers = {**_BASE_HEADERS, **self._extra_headers}
+        
+        # Si el User-Agent no cambia entre peticiones, los headers completos tampoco
+        if len(self._user_agents) == 1 or not self._user_agent_rotation:
+            self._fixed_headers = {"User-Agent": self._user_agents[0], **self._static_headers}
+        else:
+            self._fixed_headers = None
+        self._proxy_dicts = [{'http': proxy, 'https': proxy} for proxy in self._proxies]
+        self._proxy_cycle = cycle(self._proxy_dicts)
     
     def _parse_user_agents(self):
         """Parsea la lista de User-Agents desde user_agent_list."""
         ua_list = getattr(self._settings, 'user_agent_list', None)
         
         if ua_list:
-            # Separar por líneas y limpiar
-            self._user_agents = [
-                ua.strip() 
-                for ua in ua_list.split('\n') 
-                if ua.strip()
-            ]
+            # Separar por líneas y limpiar (parseo cacheado por texto)
+            self._user_agents = parse_lines(ua_list)
         
         # Fallback al user_agent antiguo si no hay lista
         if not self._user_agents:
             old_ua = getattr(self._settings, 'user_agent', None)
             if old_ua:
-                self._user_agents = [old_ua]
+                self._user_agents = (old_ua,)
         
         # Fallback a User-Agent por defecto
         if not self._user_agents:
-            self._user_agents = [
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            ]
+            self._user_agents = (
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            )
+        
+        self._user_agent_cycle = cycle(self._user_agents)
     
     def _parse_proxies(self):
         """Parsea la lista de proxies desde proxy_list."""
-        if not getattr(self._settings, 'proxies_enabled', False):
-            self._proxies = []
+        if not self._proxies_enabled:
+            self._proxies = ()
             return
         
         proxy_list = getattr(self._settings, 'proxy_list', None)
         
-        if proxy_list:
-            # Separar por líneas y limpiar
-            self._proxies = [
-                proxy.strip() 
-                for proxy in proxy_list.split('\n') 
-                if proxy.strip()
-            ]
-        else:
-            self._proxies = []
+        # Separar por líneas y limpiar (parseo cacheado por texto)
+        self._proxies = parse_lines(proxy_list)
     
     def reload(self):
         """Recarga la configuración desde la base de datos."""
@@ -127,22 +168,12 @@ class ScraperConfig:
         if not self._user_agents:
             return "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         
-        # Verificar si rotación está activada
-        rotation = getattr(self._settings, 'user_agent_rotation', True)
-        
-        if not rotation:
+        if not self._user_agent_rotation:
             # Sin rotación, usar siempre el primero
             return self._user_agents[0]
         
-        # Con rotación
-        if len(self._user_agents) == 1:
-            return self._user_agents[0]
-        
-        # Rotar secuencialmente
-        user_agent = self._user_agents[self._user_agent_index]
-        self._user_agent_index = (self._user_agent_index + 1) % len(self._user_agents)
-        
-        return user_agent
+        # Rotar secuencialmente (con uno solo, cycle lo devuelve siempre)
+        return next(self._user_agent_cycle)
     
     def get_random_user_agent(self) -> str:
         """
@@ -162,24 +193,13 @@ class ScraperConfig:
         Incluye User-Agent + headers adicionales de configuración.
         
         Returns:
-            dict: Headers completos
+            dict: Headers completos (sin rotación puede ser un dict precalculado, no modificar)
         """
-        # Headers base
-        headers = {
-            "User-Agent": self.get_user_agent(),
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
-            "X-Requested-With": "XMLHttpRequest"
-        }
-        
-        # Añadir headers adicionales de configuración
-        additional_headers = getattr(self._settings, 'default_headers', None)
+        if self._fixed_headers is not None:
+            return self._fixed_headers
         
-        if additional_headers and isinstance(additional_headers, dict):
-            # Merge headers (los adicionales tienen prioridad)
-            headers.update(additional_headers)
-        
-        return headers
+        # Headers base + adicionales de configuración (los adicionales tienen prioridad)
+        return {"User-Agent": next(self._user_agent_cycle), **self._static_headers}
     
     def get_proxy(self) -> Optional[Dict[str, str]]:
         """
@@ -187,29 +207,27 @@ class ScraperConfig:
         
         Returns:
             dict: {'http': 'proxy_url', 'https': 'proxy_url'} o None si no hay proxies
+                  (dict precalculado, no modificar)
         """
-        if not getattr(self._settings, 'proxies_enabled', False):
-            return None
-        
-        if not self._proxies:
+        # _proxies ya está vacío si proxies_enabled es False
+        if not self._proxy_dicts:
             return None
         
-        # Verificar si rotación está activada
-        rotation = getattr(self._settings, 'proxy_rotation', True)
-        
-        if not rotation:
+        if not self._proxy_rotation:
             # Sin rotación, usar siempre el primero
-            proxy = self._proxies[0]
-        else:
-            # Con rotación secuencial
-            proxy = self._proxies[self._proxy_index]
-            self._proxy_index = (self._proxy_index + 1) % len(self._proxies)
+            return self._proxy_dicts[0]
         
-        # Formato para requests
-        return {
-            'http': proxy,
-            'https': proxy
-        }
+        # Con rotación secuencial (ya en formato para requests)
+        return next(self._proxy_cycle)
+    
+    def has_proxies(self) -> bool:
+        """
+        Indica si hay proxies activos (habilitados y con al menos uno en la lista).
+        
+        Returns:
+            bool: True si get_proxy() puede devolver un proxy
+        """
+        return bool(self._proxy_dicts)
     
     def get_max_products(self) -> int:
         """
@@ -218,7 +236,16 @@ class ScraperConfig:
         Returns:
             int: Número máximo de productos
         """
-        return getattr(self._settings, 'max_products_per_search', 100)
+        return self._max_products
+    
+    def get_http_pool_maxsize(self) -> int:
+        """
+        Obtiene el tamaño del pool de conexiones HTTP (keep-alive) por host.
+        
+        Returns:
+            int: Conexiones máximas en el pool
+        """
+        return HTTP_POOL_MAXSIZE
     
     def get_vinted_domain(self) -> str:
         """
@@ -227,7 +254,7 @@ class ScraperConfig:
         Returns:
             str: Dominio (ej: 'vinted.es')
         """
-        return getattr(self._settings, 'vinted_domain', 'vinted.es')
+        return self._vinted_domain
     
     def get_stats(self) -> Dict:
         """
@@ -238,13 +265,13 @@ class ScraperConfig:
         """
         return {
             'user_agents_count': len(self._user_agents),
-            'user_agent_rotation': getattr(self._settings, 'user_agent_rotation', True),
-            'proxies_enabled': getattr(self._settings, 'proxies_enabled', False),
+            'user_agent_rotation': self._user_agent_rotation,
+            'proxies_enabled': self._proxies_enabled,
             'proxies_count': len(self._proxies),
-            'proxy_rotation': getattr(self._settings, 'proxy_rotation', True),
+            'proxy_rotation': self._proxy_rotation,
             'max_products': self.get_max_products(),
             'vinted_domain': self.get_vinted_domain(),
-            'has_custom_headers': bool(getattr(self._settings, 'default_headers', None))
+            'has_custom_headers': self._has_custom_headers
         }
     
     @property
@@ -5,9 +5,40 @@ Proporciona funciones de ayuda para obtener y actualizar la configuración
 desde cualquier parte de la aplicación.
 """
 
+from functools import lru_cache
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models import Settings
-from typing import Optional, List
+from typing import Optional, List, Tuple
+
+
+# Textos multilínea distintos cuyo parseo se guarda (listas de palabras, proxies, UAs...)
+PARSED_LINES_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=PARSED_LINES_CACHE_SIZE)
+def parse_lines(text: Optional[str], lowercase: bool = False) -> Tuple[str, ...]:
+    """
+    Parsea un campo de texto con un valor por línea (ignorando líneas vacías).
+    
+    Cacheado por valor del texto: mientras la configuración no cambie, cada
+    lista se parsea una sola vez por proceso aunque se creen muchos
+    FilterManager/ScraperConfig. Al guardar un texto distinto se parsea de nuevo.
+    
+    Args:
+        text: Texto con un elemento por línea (o None)
+        lowercase: Pasar los elementos a minúsculas
+    
+    Returns:
+        tuple: Elementos limpios (tupla: el resultado cacheado es inmutable)
+    """
+    if not text:
+        return ()
+    
+    items = (line.strip() for line in text.split('\n'))
+    if lowercase:
+        return tuple(item.lower() for item in items if item)
+    return tuple(item for item in items if item)
 
 
 def get_settings(db: Session) -> Settings:
@@ -15,13 +46,16 @@ def get_settings(db: Session) -> Settings:
     Obtiene la configuración actual.
     Si no existe, la crea con valores por defecto.
     
+    Usa db.get(): si la fila ya está cargada en la sesión sale del identity
+    map sin repetir el SELECT.
+    
     Args:
         db: Sesión de base de datos
         
     Returns:
         Objeto Settings con la configuración
     """
-    settings = db.query(Settings).filter(Settings.id == 1).first()
+    settings = db.get(Settings, 1)
     
     if not settings:
         settings = Settings(id=1)
@@ -32,6 +66,27 @@ def get_settings(db: Session) -> Settings:
     return settings
 
 
+def _get_setting_value(db: Session, column):
+    """
+    Lee una sola columna de Settings sin construir el objeto ORM completo.
+    
+    Si la fila aún no existe se crea con get_settings() (valores por defecto).
+    
+    Args:
+        db: Sesión de base de datos
+        column: Columna de Settings (ej: Settings.vinted_domain)
+        
+    Returns:
+        Valor de la columna
+    """
+    row = db.execute(select(column).where(Settings.id == 1)).first()
+    
+    if row is None:
+        return getattr(get_settings(db), column.key)
+    
+    return row[0]
+
+
 def get_vinted_domain(db: Session) -> str:
     """
     Obtiene el dominio de Vinted configurado.
@@ -42,8 +97,7 @@ def get_vinted_domain(db: Session) -> str:
     Returns:
         Dominio de Vinted (ej: "vinted.es")
     """
-    settings = get_settings(db)
-    return settings.vinted_domain
+    return _get_setting_value(db, Settings.vinted_domain)
 
 
 def get_vinted_url(db: Session, vinted_id: str) -> str:
@@ -71,67 +125,61 @@ def get_proxies(db: Session) -> Optional[List[str]]:
     Returns:
         Lista de proxies o None si no están activados
     """
-    settings = get_settings(db)
+    row = db.execute(
+        select(Settings.proxies_enabled, Settings.proxy_list).where(Settings.id == 1)
+    ).first()
     
-    if not settings.proxies_enabled or not settings.proxy_list:
+    if row is None:
+        settings = get_settings(db)
+        row = (settings.proxies_enabled, settings.proxy_list)
+    
+    proxies_enabled, proxy_list = row
+    
+    if not proxies_enabled or not proxy_list:
         return None
     
     # Parsear lista de proxies (uno por línea)
-    proxies = [
-        proxy.strip() 
-        for proxy in settings.proxy_list.split('\n') 
-        if proxy.strip()
-    ]
+    proxies = list(parse_lines(proxy_list))
     
     return proxies if proxies else None
 
 
-def get_banned_words(db: Session) -> List[str]:
+def get_banned_words(db: Session, settings: Optional[Settings] = None) -> List[str]:
     """
     Obtiene la lista de palabras prohibidas globales.
     
     Args:
         db: Sesión de base de datos
+        settings: Configuración ya cargada (opcional, evita volver a leerla)
         
     Returns:
         Lista de palabras prohibidas (en minúsculas)
     """
-    settings = get_settings(db)
-    
-    if not settings.global_banned_words:
-        return []
+    if settings is not None:
+        banned_words = settings.global_banned_words
+    else:
+        banned_words = _get_setting_value(db, Settings.global_banned_words)
     
-    words = [
-        word.strip().lower() 
-        for word in settings.global_banned_words.split('\n') 
-        if word.strip()
-    ]
-    
-    return words
+    return list(parse_lines(banned_words, lowercase=True))
 
 
-def get_banned_sellers(db: Session) -> List[str]:
+def get_banned_sellers(db: Session, settings: Optional[Settings] = None) -> List[str]:
     """
     Obtiene la lista de vendedores bloqueados globalmente.
     
     Args:
         db: Sesión de base de datos
+        settings: Configuración ya cargada (opcional, evita volver a leerla)
         
     Returns:
         Lista de IDs/nombres de vendedores bloqueados
     """
-    settings = get_settings(db)
-    
-    if not settings.global_banned_sellers:
-        return []
-    
-    sellers = [
-        seller.strip() 
-        for seller in settings.global_banned_sellers.split('\n') 
-        if seller.strip()
-    ]
+    if settings is not None:
+        banned_sellers = settings.global_banned_sellers
+    else:
+        banned_sellers = _get_setting_value(db, Settings.global_banned_sellers)
     
-    return sellers
+    return list(parse_lines(banned_sellers))
 
 
 def get_request_headers(db: Session) -> dict:
@@ -184,7 +232,7 @@ def should_filter_product(
         return True
     
     # Filtrar por palabras prohibidas
-    banned_words = get_banned_words(db)
+    banned_words = get_banned_words(db, settings)
     if banned_words:
         text = f"{title} {description or ''}".lower()
         for word in banned_words:
@@ -193,7 +241,7 @@ def should_filter_product(
     
     # Filtrar por vendedores bloqueados
     if seller_id:
-        banned_sellers = get_banned_sellers(db)
+        banned_sellers = get_banned_sellers(db, settings)
         if seller_id in banned_sellers:
             return True
     
@@ -5,10 +5,129 @@ Extrae todos los parámetros de una URL de búsqueda de Vinted
 para poder replicar búsquedas avanzadas hechas en la web oficial.
 """
 
-from urllib.parse import urlparse, parse_qs
+import re
+from functools import lru_cache
+from urllib.parse import unquote
 from typing import Optional
 
 
+# Regex de RFC 3986 (apéndice B) compilada una sola vez: una pasada extrae
+# esquema (2), host (4), ruta (5), query (7) y fragmento (9)
+_URL_RE = re.compile(r"^(([^:/?#]+):)?(//([^/?#]*))?([^?#]*)(\?([^#]*))?(#(.*))?")
+
+# Dominios de Vinted aceptados (host sin 'www.' ni puerto)
+VINTED_DOMAINS = frozenset((
+    'vinted.com', 'vinted.co.uk', 'vinted.es', 'vinted.fr', 'vinted.it', 'vinted.de',
+    'vinted.at', 'vinted.be', 'vinted.nl', 'vinted.lu', 'vinted.pl', 'vinted.cz',
+    'vinted.sk', 'vinted.lt', 'vinted.pt', 'vinted.se', 'vinted.dk', 'vinted.fi',
+    'vinted.ro', 'vinted.hu', 'vinted.hr', 'vinted.gr', 'vinted.ie',
+))
+
+# URLs parseadas que se guardan (las búsquedas guardadas y los formularios
+# reenviados repiten la misma URL)
+PARSED_URL_CACHE_SIZE = 1024
+
+# Mapeo de parámetros Vinted → nuestro modelo
+# Parámetros simples (string/number)
+_SIMPLE_PARAMS = {
+    'search_text': ('query', str),
+    'price_from': ('price_from', float),
+    'price_to': ('price_to', float),
+    'order': ('order', str),
+}
+
+# Parámetros array conocidos que queremos guardar
+# Mapeo: nombre_en_vinted → nombre_en_nuestro_modelo
+_ARRAY_PARAMS = {
+    'category_ids[]': 'category_ids',
+    'catalog[]': 'category_ids',  # Vinted usa ambos nombres
+    'brand_ids[]': 'brand_ids',
+    'size_ids[]': 'size_ids',
+    'color_ids[]': 'color_ids',
+    'material_ids[]': 'material_ids',
+    'status_ids[]': 'status_ids',
+    'video_game_platform_ids[]': 'platform_ids',  # Añadido para plataformas
+}
+
+# Solo se guardan los valores de estos parámetros (el resto se ignora:
+# currency, time, search_id...)
+_WANTED_PARAMS = frozenset(_SIMPLE_PARAMS) | frozenset(_ARRAY_PARAMS)
+
+# Formato del rango de precios en la vista previa según (hay price_from, hay price_to)
+_PREVIEW_PRICE_FORMATS = {
+    (True, True): "💰 {0}€ - {1}€",
+    (True, False): "💰 Desde {0}€",
+    (False, True): "💰 Hasta {1}€",
+    (False, False): None,
+}
+
+# Filtros que se resumen en la vista previa (campo, etiqueta), en orden
+_PREVIEW_FILTER_LABELS = (
+    ('brand_ids', 'marca(s)'),
+    ('size_ids', 'talla(s)'),
+    ('color_ids', 'color(es)'),
+    ('category_ids', 'categoría(s)'),
+)
+
+# Campos array que deben ser listas no vacías al validar
+_VALIDATED_ARRAY_FIELDS = ('category_ids', 'brand_ids', 'size_ids', 'color_ids', 'material_ids', 'status_ids')
+
+
+def _decode_component(text: str) -> str:
+    """Decodifica una clave/valor de query ('+' y %XX) solo si hace falta."""
+    if '+' in text:
+        text = text.replace('+', ' ')
+    if '%' in text:
+        text = unquote(text)
+    return text
+
+
+def _is_int_literal(text: str) -> bool:
+    """True si el texto es un entero ASCII (con '-' opcional), sin pasar por int()."""
+    if text[:1] == '-':
+        text = text[1:]
+    return text.isascii() and text.isdigit()
+
+
+def _scan_query(query: str) -> dict:
+    """
+    Recorre la query una sola vez y agrupa los valores de los parámetros conocidos.
+    
+    Mismo resultado que parse_qs() para esas claves (se descartan los pares
+    sin valor), pero sin decodificar ni guardar los parámetros que no se usan
+    y sin llamar a unquote() cuando el texto no tiene '%'.
+    
+    Args:
+        query: Query string sin el '?'
+    
+    Returns:
+        dict clave_vinted -> lista de valores (en orden de aparición)
+    """
+    params = {}
+    start = 0
+    end = len(query)
+    
+    while start < end:
+        amp = query.find('&', start)
+        if amp == -1:
+            amp = end
+        
+        eq = query.find('=', start, amp)
+        if eq != -1 and eq + 1 < amp:
+            key = _decode_component(query[start:eq])
+            if key in _WANTED_PARAMS:
+                value = _decode_component(query[eq + 1:amp])
+                values = params.get(key)
+                if values is None:
+                    params[key] = [value]
+                else:
+                    values.append(value)
+        
+        start = amp + 1
+    
+    return params
+
+
 def parse_vinted_url(url: str) -> dict:
     """
     Parsea una URL de Vinted y extrae todos los parámetros de búsqueda.
@@ -38,81 +157,73 @@ def parse_vinted_url(url: str) -> dict:
     if not url or not isinstance(url, str):
         raise ValueError("URL no válida: debe ser una cadena de texto")
     
+    # Copia del resultado cacheado (el dict y sus listas no deben mutarse)
+    return {
+        key: list(value) if isinstance(value, list) else value
+        for key, value in _parse_vinted_url_cached(url).items()
+    }
+
+
+@lru_cache(maxsize=PARSED_URL_CACHE_SIZE)
+def _parse_vinted_url_cached(url: str) -> dict:
+    """
+    Parseo real de parse_vinted_url, cacheado por URL.
+    
+    Devuelve el dict compartido de la caché: usar siempre parse_vinted_url(),
+    que entrega una copia. Los errores (ValueError) no se cachean.
+    """
     # Añadir https:// si no lo tiene
     if not url.startswith(('http://', 'https://')):
         url = 'https://' + url
     
-    # Parsear URL
-    try:
-        parsed = urlparse(url)
-    except Exception as e:
-        raise ValueError(f"Error parseando URL: {e}")
+    # Parsear URL (la regex casa con cualquier cadena)
+    match = _URL_RE.match(url)
+    netloc = match.group(4) or ''
     
-    # Validar que es de Vinted
-    if 'vinted' not in parsed.netloc:
-        raise ValueError(f"URL no es de Vinted: {parsed.netloc}")
+    # Validar que es de Vinted (dominio exacto: 'notvinted-evil.com' no vale)
+    host = netloc.rpartition('@')[2].partition(':')[0].lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if host not in VINTED_DOMAINS:
+        raise ValueError(f"URL no es de Vinted: {netloc}")
     
-    # Extraer query parameters
-    params = parse_qs(parsed.query)
+    # Extraer query parameters (solo los conocidos, en una pasada)
+    params = _scan_query(match.group(7) or '')
     
     # Resultado
     result = {}
     
-    # Mapeo de parámetros Vinted → nuestro modelo
-    # Parámetros simples (string/number)
-    simple_params = {
-        'search_text': ('query', str),
-        'price_from': ('price_from', float),
-        'price_to': ('price_to', float),
-        'order': ('order', str),
-    }
-    
-    # Parámetros array conocidos que queremos guardar
-    # Mapeo: nombre_en_vinted → nombre_en_nuestro_modelo
-    array_params_map = {
-        'category_ids[]': 'category_ids',
-        'catalog[]': 'category_ids',  # Vinted usa ambos nombres
-        'brand_ids[]': 'brand_ids',
-        'size_ids[]': 'size_ids',
-        'color_ids[]': 'color_ids',
-        'material_ids[]': 'material_ids',
-        'status_ids[]': 'status_ids',
-        'video_game_platform_ids[]': 'platform_ids',  # Añadido para plataformas
-    }
-    
-    # Lista de parámetros que NO guardamos (ignorar)
-    ignored_params = [
-        # 'video_game_platform_ids[]',  # Ya no se ignora, ahora se mapea
-        'order',  # Orden no es filtro de búsqueda
-        'currency',  # Siempre EUR en España
-        'time',  # Timestamp
-        'search_id',  # ID interno de Vinted
-    ]
-    
     # Procesar parámetros simples
-    for vinted_key, (our_key, type_converter) in simple_params.items():
+    simple_found = 0
+    for vinted_key, (our_key, type_converter) in _SIMPLE_PARAMS.items():
         if vinted_key in params:
-            value = params[vinted_key][0]  # parse_qs devuelve listas
+            simple_found += 1
+            value = params[vinted_key][0]  # el primero si se repite
             try:
                 result[our_key] = type_converter(value)
             except (ValueError, TypeError):
                 # Si no se puede convertir, ignorar
                 pass
     
-    # Procesar parámetros array
-    for vinted_key, our_key in array_params_map.items():
+    # Procesar parámetros array (params solo tiene claves conocidas: si todas
+    # eran simples, la URL es plana y no hay nada más que recorrer)
+    if len(params) == simple_found:
+        array_items = ()
+    else:
+        array_items = _ARRAY_PARAMS.items()
+    
+    for vinted_key, our_key in array_items:
         if vinted_key in params:
-            # Convertir a lista de enteros
-            try:
-                values = [int(v) for v in params[vinted_key]]
-                # Si ya existe este campo, combinar valores (evitar duplicados)
-                if our_key in result:
-                    result[our_key] = list(set(result[our_key] + values))
-                else:
-                    result[our_key] = values
-            except (ValueError, TypeError):
-                # Si no se puede convertir, ignorar
-                pass
+            # Convertir a lista de enteros (los valores no numéricos se descartan uno a uno)
+            values = [int(v) for v in params[vinted_key] if _is_int_literal(v)]
+            if not values:
+                continue
+            
+            # Si ya existe este campo, combinar valores (evitar duplicados)
+            if our_key in result:
+                result[our_key] = list(dict.fromkeys(result[our_key] + values))
+            else:
+                result[our_key] = values
     
     # Validar que al menos tiene algo útil
     if not result:
@@ -129,30 +240,33 @@ def validate_vinted_search_params(params: dict) -> dict:
         params: Diccionario con parámetros (de parse_vinted_url o manual)
     
     Returns:
-        dict con parámetros validados y valores por defecto
+        dict con parámetros validados y valores por defecto (el mismo
+        dict recibido si no hay nada que añadir: no modificarlo después)
     
     Raises:
         ValueError: Si faltan parámetros requeridos o hay valores inválidos
     """
-    result = params.copy()
-    
-    # Query por defecto vacío (permitimos búsqueda solo por precio/filtros)
-    if 'query' not in result:
-        result['query'] = ""
-    
     # Validar precios
-    if 'price_from' in result and 'price_to' in result:
-        if result['price_from'] > result['price_to']:
+    if 'price_from' in params and 'price_to' in params:
+        if params['price_from'] > params['price_to']:
             raise ValueError("price_from no puede ser mayor que price_to")
-        if result['price_from'] < 0 or result['price_to'] < 0:
+        if params['price_from'] < 0 or params['price_to'] < 0:
             raise ValueError("Los precios no pueden ser negativos")
     
     # Validar arrays (deben ser listas no vacías)
-    for key in ['category_ids', 'brand_ids', 'size_ids', 'color_ids', 'material_ids', 'status_ids']:
-        if key in result:
-            if not isinstance(result[key], list) or not result[key]:
+    for key in _VALIDATED_ARRAY_FIELDS:
+        if key in params:
+            if not isinstance(params[key], list) or not params[key]:
                 raise ValueError(f"{key} debe ser una lista no vacía")
     
+    # Ya válido y con query: se devuelve tal cual, sin copiar
+    if 'query' in params:
+        return params
+    
+    # Query por defecto vacío (permitimos búsqueda solo por precio/filtros)
+    result = params.copy()
+    result['query'] = ""
+    
     return result
 
 
@@ -175,23 +289,18 @@ def format_vinted_url_preview(params: dict) -> str:
     if params.get('query'):
         parts.append(f"🔍 {params['query']}")
     
-    if params.get('price_from') is not None and params.get('price_to') is not None:
-        parts.append(f"💰 {params['price_from']}€ - {params['price_to']}€")
-    elif params.get('price_from') is not None:
-        parts.append(f"💰 Desde {params['price_from']}€")
-    elif params.get('price_to') is not None:
-        parts.append(f"💰 Hasta {params['price_to']}€")
+    price_from = params.get('price_from')
+    price_to = params.get('price_to')
+    price_format = _PREVIEW_PRICE_FORMATS[(price_from is not None, price_to is not None)]
+    if price_format:
+        parts.append(price_format.format(price_from, price_to))
     
-    # Contar filtros adicionales
+    # Contar filtros adicionales (una consulta al dict por campo)
     filter_counts = []
-    if params.get('brand_ids'):
-        filter_counts.append(f"{len(params['brand_ids'])} marca(s)")
-    if params.get('size_ids'):
-        filter_counts.append(f"{len(params['size_ids'])} talla(s)")
-    if params.get('color_ids'):
-        filter_counts.append(f"{len(params['color_ids'])} color(es)")
-    if params.get('category_ids'):
-        filter_counts.append(f"{len(params['category_ids'])} categoría(s)")
+    for key, label in _PREVIEW_FILTER_LABELS:
+        values = params.get(key)
+        if values:
+            filter_counts.append(f"{len(values)} {label}")
     
     if filter_counts:
         parts.append(f"🎯 {', '.join(filter_counts)}")
@@ -7,10 +7,7 @@ Uso:
     python init_settings.py
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from config import settings as app_config
-from app.database import Base
+from app.database import Base, SessionLocal, engine
 from app.models import Settings
 
 def init_settings_table():
@@ -19,24 +16,17 @@ def init_settings_table():
     """
     print("🔧 Inicializando tabla de configuración...")
     
-    # Conectar a la base de datos
-    engine = create_engine(
-        app_config.DATABASE_URL,
-        connect_args={"check_same_thread": False} if "sqlite" in app_config.DATABASE_URL else {}
-    )
-    
     # Crear solo la tabla Settings si no existe
     Base.metadata.create_all(bind=engine, tables=[Settings.__table__])
     
     print("✅ Tabla 'settings' creada correctamente")
     
-    # Crear sesión
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Misma sesión/engine que la app (pool y serializadores JSON incluidos)
     db = SessionLocal()
     
     try:
         # Verificar si ya existe configuración
-        existing_settings = db.query(Settings).filter(Settings.id == 1).first()
+        existing_settings = db.get(Settings, 1)
         
         if existing_settings:
             print("ℹ️  Ya existe una configuración en la base de datos")
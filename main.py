@@ -16,15 +16,67 @@ Este archivo:
 - Health check mejorado con info del scheduler
 """
 
+import logging
+import time
+from datetime import date, time as dt_time
+from functools import lru_cache
+
 from fastapi import FastAPI
+from sqlalchemy import text
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
+# orjson es opcional: si está instalado, las respuestas JSON (listas de
+# productos, logs...) se codifican en C, datetimes incluidos
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 from config import settings
 from app.database import init_db
+from app.utils.logging_config import configure_logging
+
+
+# Logging de la app (scheduler, scraper...): configurado una sola vez al arrancar
+configure_logging(logging.DEBUG if settings.DEBUG else logging.INFO)
+
+
+# Banners de arranque/parada: texto fijo, se escribe de una vez
+_STARTUP_BANNER = "\n".join((
+    "\n" + "="*80,
+    "🚀 VINTED SCRAPER - INICIANDO",
+    "="*80,
+))
+
+_READY_BANNER = "\n".join((
+    "\n" + "="*80,
+    "✅ APLICACIÓN LISTA",
+    "="*80,
+    "📍 Servidor: http://localhost:8000",
+    "📚 API Docs: http://localhost:8000/docs",
+    "📊 Dashboard: http://localhost:8000/",
+    "📅 Scheduler: http://localhost:8000/scheduler",
+    "⚙️  Configuración: http://localhost:8000/settings",
+    "="*80 + "\n",
+))
+
+_SHUTDOWN_BANNER = "\n".join((
+    "\n" + "="*80,
+    "🛑 VINTED SCRAPER - DETENIENDO",
+    "="*80,
+))
+
+_GOODBYE_BANNER = "\n".join((
+    "="*80,
+    "👋 ¡HASTA PRONTO!",
+    "="*80 + "\n",
+))
 
 
 @asynccontextmanager
@@ -43,9 +95,7 @@ async def lifespan(app: FastAPI):
     # ========================================================================
     # --- STARTUP ---
     # ========================================================================
-    print("\n" + "="*80)
-    print("🚀 VINTED SCRAPER - INICIANDO")
-    print("="*80)
+    print(_STARTUP_BANNER)
     
     # 1. Inicializar base de datos (crear tablas si no existen)
     print("\n📊 Inicializando base de datos...")
@@ -63,7 +113,7 @@ async def lifespan(app: FastAPI):
     
     db = SessionLocal()
     try:
-        settings_record = db.query(Settings).filter(Settings.id == 1).first()
+        settings_record = db.get(Settings, 1)
         if not settings_record:
             print("   📝 Creando configuración por defecto...")
             default_settings = Settings(id=1)
@@ -115,24 +165,14 @@ async def lifespan(app: FastAPI):
         print("   El servidor continuará SIN scheduler automático")
     
     # 4. Información final
-    print("\n" + "="*80)
-    print("✅ APLICACIÓN LISTA")
-    print("="*80)
-    print(f"📍 Servidor: http://localhost:8000")
-    print(f"📚 API Docs: http://localhost:8000/docs")
-    print(f"📊 Dashboard: http://localhost:8000/")
-    print(f"📅 Scheduler: http://localhost:8000/scheduler")
-    print(f"⚙️  Configuración: http://localhost:8000/settings")
-    print("="*80 + "\n")
+    print(_READY_BANNER)
     
     yield  # La aplicación se ejecuta aquí (manejando peticiones)
     
     # ========================================================================
     # --- SHUTDOWN ---
     # ========================================================================
-    print("\n" + "="*80)
-    print("🛑 VINTED SCRAPER - DETENIENDO")
-    print("="*80)
+    print(_SHUTDOWN_BANNER)
     
     # Detener el scheduler de forma ordenada
     try:
@@ -143,9 +183,7 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"⚠️  Error deteniendo scheduler: {e}")
     
-    print("="*80)
-    print("👋 ¡HASTA PRONTO!")
-    print("="*80 + "\n")
+    print(_GOODBYE_BANNER)
 
 
 # ============================================================================
@@ -157,7 +195,8 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="Sistema de scraping automático para encontrar productos en Vinted con scheduler avanzado y notificaciones",
     lifespan=lifespan,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    default_response_class=DefaultResponse
 )
 
 
@@ -171,14 +210,16 @@ async def validation_exception_handler(request, exc):
     Maneja errores de validación de Pydantic de forma más clara.
     Útil para debugging durante el desarrollo.
     """
+    errors = exc.errors()
     print(f"❌ Error de validación en {request.method} {request.url.path}")
-    for error in exc.errors():
+    for error in errors:
         print(f"   • {error['loc']}: {error['msg']}")
     
-    return JSONResponse(
+    # jsonable_encoder: el ctx de los errores puede llevar la excepción original
+    return DefaultResponse(
         status_code=422,
         content={
-            "detail": exc.errors(),
+            "detail": jsonable_encoder(errors),
             "body": str(exc.body) if hasattr(exc, 'body') else None
         }
     )
@@ -200,6 +241,13 @@ except RuntimeError:
 templates = Jinja2Templates(directory="templates")
 
 # ⭐ Filtro para banderas Unicode a partir de código país
+# Tabla precalculada AA..ZZ -> bandera (offset Unicode 127397 por letra)
+_COUNTRY_FLAGS = {
+    chr(first) + chr(second): chr(first + 127397) + chr(second + 127397)
+    for first in range(ord('A'), ord('Z') + 1)
+    for second in range(ord('A'), ord('Z') + 1)
+}
+
 def country_flag(code):
     """
     Convierte un código de país (ES, FR, etc.) en su emoji de bandera.
@@ -207,9 +255,7 @@ def country_flag(code):
     """
     if not code or len(code) != 2:
         return ""
-    code = code.upper()
-    OFFSET = 127397  # Offset Unicode para banderas
-    return chr(ord(code[0]) + OFFSET) + chr(ord(code[1]) + OFFSET)
+    return _COUNTRY_FLAGS.get(code.upper(), "")
 
 templates.env.filters["country_flag"] = country_flag
 
@@ -220,15 +266,15 @@ def format_date(dt, format='%d/%m/%Y %H:%M'):
     """
     if not dt:
         return "N/A"
-    try:
+    # Fechas/horas se formatean; cualquier otra cosa (p. ej. ya es texto) tal cual
+    if isinstance(dt, (date, dt_time)):
         return dt.strftime(format)
-    except:
-        return str(dt)
+    return str(dt)
 
 templates.env.filters["format_date"] = format_date
 
 # ⭐ Filtro para formatear números con separador de miles
-def format_number(num):
+def _format_number(num):
     """
     Formatea un número con separador de miles.
     Ejemplo: 1234567 -> "1,234,567"
@@ -240,6 +286,17 @@ def format_number(num):
     except:
         return str(num)
 
+
+_format_number_cached = lru_cache(maxsize=1024)(_format_number)
+
+
+def format_number(num):
+    """Versión cacheada de _format_number; sin caché si num no es hashable."""
+    try:
+        return _format_number_cached(num)
+    except TypeError:
+        return _format_number(num)
+
 templates.env.filters["format_number"] = format_number
 
 # Hacer templates disponible globalmente en la app
@@ -269,6 +326,16 @@ app.include_router(settings_api.router, prefix="/api", tags=["Settings API"])
 # ENDPOINTS ESPECIALES
 # ============================================================================
 
+# Consulta de comprobación de la BD (construida una sola vez)
+_HEALTH_PING = text("SELECT 1")
+
+# Segundos que se reutiliza una respuesta "healthy" (los monitores sondean a ráfagas)
+HEALTH_CACHE_TTL_SECONDS = 1.0
+
+# Última respuesta sana y su instante (time.monotonic)
+_health_cache = {"checked_at": 0.0, "response": None}
+
+
 @app.get("/health")
 async def health_check():
     """
@@ -278,15 +345,35 @@ async def health_check():
     - La app está viva
     - La BD está accesible
     - El scheduler está funcionando
+    
+    Una respuesta sana se reutiliza durante HEALTH_CACHE_TTL_SECONDS; una
+    degradada nunca se cachea, así que las caídas se ven en el siguiente sondeo.
     """
-    from app.database import SessionLocal
+    now = time.monotonic()
+    cached = _health_cache["response"]
+    if cached is not None and now - _health_cache["checked_at"] < HEALTH_CACHE_TTL_SECONDS:
+        return cached
+    
+    response = _probe_health()
+    
+    if response["status"] == "healthy":
+        _health_cache["checked_at"] = now
+        _health_cache["response"] = response
+    else:
+        _health_cache["response"] = None
     
-    # Verificar BD
+    return response
+
+
+def _probe_health() -> dict:
+    """Comprueba BD y scheduler y construye la respuesta de /health."""
+    from app.database import engine
+    
+    # Verificar BD (conexión del pool directamente, sin sesión ORM)
     db_healthy = False
     try:
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
+        with engine.connect() as connection:
+            connection.execute(_HEALTH_PING)
         db_healthy = True
     except Exception as e:
         print(f"⚠️  Health check - BD no accesible: {e}")
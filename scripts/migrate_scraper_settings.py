@@ -20,149 +20,172 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import text
-from app.database import engine
+
+
+# User-Agents por defecto: el primero es también el user_agent de la fila
+# por defecto (se sustituye por el user_agent actual si ya había uno)
+DEFAULT_USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+)
+
+# Fila de settings por defecto si no existe (user_agent_list se añade al
+# insertarla, ya con la lista migrada)
+DEFAULT_SETTINGS_ROW = {
+    "id": 1,
+    "user_agent": DEFAULT_USER_AGENTS[0],
+    "user_agent_rotation": 1,
+    "push_notifications_enabled": 0,
+    "proxies_enabled": 0,
+    "proxy_rotation": 1,
+    "global_min_price": 0.0,
+    "auto_delete_products_days": 30,
+    "auto_mark_notified_hours": 24,
+    "max_products_in_db": 10000,
+    "max_products_per_search": 100,
+    "theme": "light",
+    "language": "es",
+    "currency": "EUR",
+    "vinted_domain": "vinted.es",
+}
+
+_DEFAULT_SETTINGS_COLUMNS = (*DEFAULT_SETTINGS_ROW, "user_agent_list")
+
+# Lo que devuelve la escritura para verificarla: nº de User-Agents contado
+# en SQL (líneas = saltos de línea + 1; 0 si la lista está vacía) en vez de
+# traer el texto completo de la lista
+_RETURNING_VERIFICATION = (
+    "RETURNING CASE WHEN coalesce(user_agent_list, '') = '' THEN 0 "
+    "ELSE length(user_agent_list) - length(replace(user_agent_list, char(10), '')) + 1 END, "
+    "user_agent_rotation"
+)
+
+# INSERT parametrizado de la fila por defecto (columnas = claves de la fila)
+INSERT_DEFAULT_SETTINGS = text(
+    f"INSERT INTO settings ({', '.join(_DEFAULT_SETTINGS_COLUMNS)}) "
+    f"VALUES ({', '.join(':' + column for column in _DEFAULT_SETTINGS_COLUMNS)}) "
+    + _RETURNING_VERIFICATION
+)
+
+# PRAGMAs de SQLite para la conexión de la migración (solo duran lo que la
+# conexión: el modo del fichero, journal_mode, no se toca)
+SQLITE_MIGRATION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+)
 
 
 def migrate():
     """Ejecuta la migración de campos de scraping."""
     
+    # Import diferido: importar el script no crea el engine de la app
+    from app.database import engine
+    
     print("=" * 60)
     print("🔄 MIGRACIÓN: Actualizar campos de scraping")
     print("=" * 60)
     print()
     
     try:
-        # 1. Verificar si ya se ejecutó la migración
-        print("📋 Verificando estado de la base de datos...")
-        
-        with engine.connect() as conn:
-            # Verificar si existe la columna user_agent_list
-            result = conn.execute(text(
-                "SELECT COUNT(*) FROM pragma_table_info('settings') WHERE name='user_agent_list'"
-            )).scalar()
+        # Toda la migración en una sola conexión y transacción: un único
+        # commit al final (y nada a medias si algo falla antes)
+        with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                for pragma in SQLITE_MIGRATION_PRAGMAS:
+                    conn.exec_driver_sql(pragma)
+            
+            # 1. Verificar si ya se ejecutó la migración
+            print("📋 Verificando estado de la base de datos...")
+            
+            # Columnas actuales de settings, leídas una vez (columna 1 = nombre)
+            columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info('settings')")}
             
-            if result > 0:
+            if 'user_agent_list' in columns and 'user_agent_rotation' in columns:
                 print("✅ La migración ya fue ejecutada anteriormente")
                 print()
                 return
-        
-        print("⚠️  La migración no se ha ejecutado, procediendo...")
-        print()
-        
-        # 2. Obtener user_agent actual (sin usar modelo Settings)
-        print("📥 Obteniendo configuración actual...")
-        
-        with engine.connect() as conn:
-            # Verificar si existe configuración
-            result = conn.execute(text(
-                "SELECT COUNT(*) FROM settings WHERE id = 1"
-            )).scalar()
             
-            if result == 0:
+            print("⚠️  La migración no se ha ejecutado, procediendo...")
+            print()
+            
+            # 2. Obtener user_agent actual (sin usar modelo Settings)
+            print("📥 Obteniendo configuración actual...")
+            
+            # Una fila si existe configuración (user_agent puede ser NULL)
+            row = conn.execute(text(
+                "SELECT user_agent FROM settings WHERE id = 1"
+            )).first()
+            
+            if row is None:
+                # La fila se crea más abajo, en la misma escritura que migra los datos
                 print("⚠️  No existe configuración, creando valores por defecto...")
-                # Crear configuración por defecto
-                conn.execute(text("""
-                    INSERT INTO settings (
-                        id, 
-                        user_agent,
-                        push_notifications_enabled,
-                        proxies_enabled,
-                        proxy_rotation,
-                        global_min_price,
-                        auto_delete_products_days,
-                        auto_mark_notified_hours,
-                        max_products_in_db,
-                        max_products_per_search,
-                        theme,
-                        language,
-                        currency,
-                        vinted_domain
-                    ) VALUES (
-                        1,
-                        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        0,
-                        0,
-                        1,
-                        0.0,
-                        30,
-                        24,
-                        10000,
-                        100,
-                        'light',
-                        'es',
-                        'EUR',
-                        'vinted.es'
-                    )
-                """))
-                conn.commit()
-                current_user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+                current_user_agent = DEFAULT_USER_AGENTS[0]
             else:
-                # Obtener user_agent actual
-                current_user_agent = conn.execute(text(
-                    "SELECT user_agent FROM settings WHERE id = 1"
-                )).scalar()
-        
-        print(f"   User-Agent actual: {current_user_agent[:60] if current_user_agent else 'N/A'}...")
-        print()
-        
-        # 3. Ejecutar ALTER TABLE
-        print("🔧 Modificando estructura de la base de datos...")
-        
-        with engine.connect() as conn:
-            # Añadir nueva columna user_agent_list
-            print("   • Añadiendo columna user_agent_list...")
-            conn.execute(text(
-                "ALTER TABLE settings ADD COLUMN user_agent_list TEXT"
-            ))
+                current_user_agent = row[0]
+            
+            print(f"   User-Agent actual: {current_user_agent[:60] if current_user_agent else 'N/A'}...")
+            print()
+            
+            # 3. Ejecutar ALTER TABLE
+            print("🔧 Modificando estructura de la base de datos...")
+            
+            # Añadir nueva columna user_agent_list (solo si falta: migración a medias)
+            if 'user_agent_list' not in columns:
+                print("   • Añadiendo columna user_agent_list...")
+                conn.execute(text(
+                    "ALTER TABLE settings ADD COLUMN user_agent_list TEXT"
+                ))
             
             # Añadir columna user_agent_rotation
-            print("   • Añadiendo columna user_agent_rotation...")
-            conn.execute(text(
-                "ALTER TABLE settings ADD COLUMN user_agent_rotation INTEGER DEFAULT 1 NOT NULL"
-            ))
+            if 'user_agent_rotation' not in columns:
+                print("   • Añadiendo columna user_agent_rotation...")
+                conn.execute(text(
+                    "ALTER TABLE settings ADD COLUMN user_agent_rotation INTEGER DEFAULT 1 NOT NULL"
+                ))
             
-            conn.commit()
-        
-        print("   ✅ Estructura actualizada")
-        print()
-        
-        # 4. Migrar datos
-        print("📤 Migrando datos...")
-        
-        # Convertir user_agent actual a user_agent_list (primera línea)
-        # Añadir algunos User-Agents por defecto
-        default_user_agents = [
-            current_user_agent if current_user_agent else "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15"
-        ]
-        
-        user_agent_list_str = "\n".join(default_user_agents)
-        
-        with engine.connect() as conn:
-            conn.execute(
-                text("UPDATE settings SET user_agent_list = :list, user_agent_rotation = 1 WHERE id = 1"),
-                {"list": user_agent_list_str}
-            )
-            conn.commit()
-        
-        print(f"   ✅ Migrados {len(default_user_agents)} User-Agents")
-        print()
-        
-        # 5. Verificar migración
-        print("🔍 Verificando migración...")
-        
-        with engine.connect() as conn:
-            result = conn.execute(text(
-                "SELECT user_agent_list, user_agent_rotation FROM settings WHERE id = 1"
-            )).first()
+            print("   ✅ Estructura actualizada")
+            print()
+            
+            # 4. Migrar datos
+            print("📤 Migrando datos...")
+            
+            # Convertir user_agent actual a user_agent_list (primera línea)
+            # Añadir algunos User-Agents por defecto
+            default_user_agents = (current_user_agent or DEFAULT_USER_AGENTS[0],) + DEFAULT_USER_AGENTS[1:]
+            
+            user_agent_list_str = "\n".join(default_user_agents)
+            
+            # Una sola escritura: crea la fila por defecto ya migrada si no
+            # existía, o actualiza solo los campos nuevos si ya existía (sin
+            # UPSERT: SQLite exige que la fila del INSERT cumpla los NOT NULL
+            # aunque acabe en el DO UPDATE). RETURNING devuelve los valores
+            # escritos para la verificación, sin otro SELECT
+            if row is not None:
+                result = conn.execute(
+                    text(
+                        "UPDATE settings SET user_agent_list = :list, user_agent_rotation = 1 WHERE id = 1 "
+                        + _RETURNING_VERIFICATION
+                    ),
+                    {"list": user_agent_list_str}
+                ).first()
+            else:
+                result = conn.execute(
+                    INSERT_DEFAULT_SETTINGS,
+                    {**DEFAULT_SETTINGS_ROW, "user_agent_list": user_agent_list_str}
+                ).first()
+            
+            print(f"   ✅ Migrados {len(default_user_agents)} User-Agents")
+            print()
+            
+            # 5. Verificar migración
+            print("🔍 Verificando migración...")
             
             if result:
-                ua_list, ua_rotation = result
-                if ua_list:
-                    ua_count = len([ua for ua in ua_list.split('\n') if ua.strip()])
+                ua_count, ua_rotation = result
+                if ua_count:
                     print(f"   ✅ user_agent_list: {ua_count} User-Agents configurados")
                     print(f"   ✅ user_agent_rotation: {'Activada' if ua_rotation else 'Desactivada'}")
                 else:
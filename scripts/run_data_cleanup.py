@@ -21,10 +21,8 @@ import sys
 import os
 import argparse
 
-# Añadir el directorio raíz al path para importar módulos
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from app.utils.data_management import DataManager
+# DataManager se importa dentro de cada run_*(): importar el script no carga
+# la BD ni los modelos ni toca sys.path (eso lo hace main())
 import logging
 
 # Configurar logging
@@ -36,27 +34,35 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _write_lines(lines):
+    """Escribe un bloque de líneas con una sola escritura a stdout (en vez de un print por línea)."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _header_lines(title: str) -> list:
+    """Líneas de un encabezado bonito."""
+    return ["", "=" * 60, f"  {title}", "=" * 60, ""]
+
+
 def print_header(title: str):
     """Imprime un encabezado bonito."""
-    print()
-    print("=" * 60)
-    print(f"  {title}")
-    print("=" * 60)
-    print()
+    _write_lines(_header_lines(title))
 
 
 def print_config(settings):
     """Muestra la configuración actual."""
-    print("⚙️  CONFIGURACIÓN ACTUAL:")
-    print(f"   • Auto-eliminar productos: {settings.auto_delete_products_days} días")
-    print(f"   • Auto-marcar notificados: {settings.auto_mark_notified_hours} horas")
-    print(f"   • Límite máximo productos: {settings.max_products_in_db}")
-    print()
+    _write_lines([
+        "⚙️  CONFIGURACIÓN ACTUAL:",
+        f"   • Auto-eliminar productos: {settings.auto_delete_products_days} días",
+        f"   • Auto-marcar notificados: {settings.auto_mark_notified_hours} horas",
+        f"   • Límite máximo productos: {settings.max_products_in_db}",
+        "",
+    ])
 
 
 def print_daily_results(results):
     """Muestra resultados de tareas diarias."""
-    print_header("📊 RESULTADOS - TAREAS DIARIAS")
+    lines = _header_lines("📊 RESULTADOS - TAREAS DIARIAS")
     
     # Productos antiguos eliminados
     old_deleted = results.get("old_products_deleted", {})
@@ -65,39 +71,46 @@ def print_daily_results(results):
     days = old_deleted.get("days", 0)
     
     status = "✅" if enabled else "⏭️ "
-    print(f"{status} Productos antiguos eliminados: {deleted}")
+    lines.append(f"{status} Productos antiguos eliminados: {deleted}")
     if enabled and days > 0:
-        print(f"   (configurado: más antiguos de {days} días)")
+        lines.append(f"   (configurado: más antiguos de {days} días)")
     elif not enabled:
-        print(f"   (función desactivada)")
+        lines.append("   (función desactivada)")
     
     # Límite de base de datos aplicado
     limit_applied = results.get("database_limit_applied", {})
     enabled = limit_applied.get("enabled", False)
     deleted = limit_applied.get("deleted", 0)
     limit = limit_applied.get("limit", 0)
-    total = limit_applied.get("total", 0)
+    total = limit_applied.get("total")  # puede faltar si no se llegó a contar
     
     status = "✅" if enabled else "⏭️ "
-    print(f"\n{status} Productos eliminados por límite: {deleted}")
+    lines.append("")
+    lines.append(f"{status} Productos eliminados por límite: {deleted}")
     if enabled and limit > 0:
-        print(f"   (configurado: máximo {limit} productos, había {total})")
+        if total is None:
+            lines.append(f"   (configurado: máximo {limit} productos)")
+        else:
+            lines.append(f"   (configurado: máximo {limit} productos, había {total})")
     elif not enabled:
-        print(f"   (función desactivada)")
+        lines.append("   (función desactivada)")
     
     # Duplicados limpiados
     dupes = results.get("duplicates_cleaned", {})
     deleted = dupes.get("deleted", 0)
     vinted_ids = dupes.get("vinted_ids", [])
     
-    print(f"\n🧹 Productos duplicados eliminados: {deleted}")
+    lines.append("")
+    lines.append(f"🧹 Productos duplicados eliminados: {deleted}")
     if deleted > 0:
-        print(f"   ({len(vinted_ids)} vinted_ids afectados)")
+        lines.append(f"   ({len(vinted_ids)} vinted_ids afectados)")
+    
+    _write_lines(lines)
 
 
 def print_periodic_results(results):
     """Muestra resultados de tareas periódicas."""
-    print_header("📊 RESULTADOS - TAREAS PERIÓDICAS")
+    lines = _header_lines("📊 RESULTADOS - TAREAS PERIÓDICAS")
     
     # Productos marcados como notificados
     marked_data = results.get("products_marked_notified", {})
@@ -106,17 +119,21 @@ def print_periodic_results(results):
     hours = marked_data.get("hours", 0)
     
     status = "✅" if enabled else "⏭️ "
-    print(f"{status} Productos marcados como notificados: {marked}")
+    lines.append(f"{status} Productos marcados como notificados: {marked}")
     if enabled and hours > 0:
-        print(f"   (configurado: más antiguos de {hours} horas)")
+        lines.append(f"   (configurado: más antiguos de {hours} horas)")
     elif not enabled:
-        print(f"   (función desactivada)")
+        lines.append("   (función desactivada)")
+    
+    _write_lines(lines)
 
 
 def run_all():
     """Ejecuta todas las tareas."""
     print_header("🔧 GESTIÓN DE DATOS - EJECUCIÓN COMPLETA")
     
+    from app.utils.data_management import DataManager
+    
     try:
         with DataManager() as manager:
             # Obtener y mostrar configuración
@@ -147,6 +164,8 @@ def run_daily():
     """Ejecuta solo tareas diarias."""
     print_header("📅 GESTIÓN DE DATOS - TAREAS DIARIAS")
     
+    from app.utils.data_management import DataManager
+    
     try:
         with DataManager() as manager:
             # Obtener y mostrar configuración
@@ -176,6 +195,8 @@ def run_periodic():
     """Ejecuta solo tareas periódicas."""
     print_header("⏰ GESTIÓN DE DATOS - TAREAS PERIÓDICAS")
     
+    from app.utils.data_management import DataManager
+    
     try:
         with DataManager() as manager:
             # Obtener y mostrar configuración
@@ -219,6 +240,9 @@ def main():
     
     args = parser.parse_args()
     
+    # Añadir el directorio raíz al path para importar módulos
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
     if args.daily:
         run_daily()
     elif args.periodic:
@@ -10,138 +10,217 @@ Este script:
 import sys
 import os
 
+import hashlib
+
 # Añadir el directorio raíz al path para imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
 
-from app.database import SessionLocal, init_db
-from app.models import Search, Product
 from datetime import datetime
 
-print("=" * 70)
-print("🧪 PREPARANDO APLICACIÓN WEB")
-print("=" * 70)
+# Los módulos de la app (engine, modelos) se importan dentro de las
+# funciones: importar este fichero no abre la BD ni ejecuta nada
+
+# Filas por INSERT al sembrar productos (una sentencia por lote)
+INSERT_BATCH_SIZE = 500
+
+# Huella del esquema tras la última inicialización correcta (solo SQLite)
+SCHEMA_VERSION_FILE = os.path.join(ROOT_DIR, ".setup_demo_schema_version")
+
+
+def schema_fingerprint():
+    """
+    Huella del esquema actual: PRAGMA schema_version de la BD más las
+    tablas, columnas e índices de los modelos.
+    
+    schema_version cambia con cada CREATE/ALTER en la BD, y la parte de los
+    modelos cambia si el código añade tablas o índices: si ninguna cambia,
+    init_db() no tiene nada que crear.
+    
+    Returns:
+        str con la huella, o None si la BD no es SQLite
+    """
+    from config import settings
+    from app import models  # noqa: F401  (registra las tablas en Base.metadata)
+    from app.database import Base, engine
+    
+    if engine.dialect.name != "sqlite":
+        return None
+    
+    with engine.connect() as conn:
+        schema_version = conn.exec_driver_sql("PRAGMA schema_version").scalar()
+    
+    tables_sig = ";".join(
+        f"{table.name}:{','.join(table.c.keys())}:{','.join(sorted(index.name for index in table.indexes))}"
+        for table in Base.metadata.sorted_tables
+    )
+    digest = hashlib.sha1(f"{settings.DATABASE_URL}|{tables_sig}".encode()).hexdigest()
+    return f"{schema_version}:{digest}"
+
 
-# 1. Inicializar base de datos
-print("\n1️⃣ Inicializando base de datos...")
-init_db()
+def read_cached_fingerprint():
+    """Lee la huella guardada en la última ejecución (None si no hay)."""
+    try:
+        with open(SCHEMA_VERSION_FILE, encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
 
-# 2. Crear datos de ejemplo si no existen
-db = SessionLocal()
-try:
-    # Verificar si ya hay datos
-    existing_searches = db.query(Search).count()
+
+def main():
+    """Inicializa la BD y crea los datos de ejemplo si no existen."""
+    from sqlalchemy import func, insert, select
+    
+    from app.database import SessionLocal, init_db
+    from app.models import Search, Product
     
-    if existing_searches == 0:
-        print("\n2️⃣ Creando datos de ejemplo...")
-        
-        # Crear 3 búsquedas de ejemplo
-        search1 = Search(
-            name="Zapatillas Nike Air Max",
-            query="nike air max",
-            price_from=20.0,
-            price_to=50.0,
-            interval_minutes=5,
-            is_active=True,
-            allowed_countries=["ES", "PT", "FR"]
-        )
-        
-        search2 = Search(
-            name="Camisetas Vintage",
-            query="camiseta vintage",
-            price_from=5.0,
-            price_to=20.0,
-            interval_minutes=10,
-            is_active=True
-        )
-        
-        search3 = Search(
-            name="Pantalones Vaqueros Levis",
-            query="levis 501",
-            price_from=15.0,
-            price_to=40.0,
-            interval_minutes=15,
-            is_active=False
-        )
-        
-        db.add_all([search1, search2, search3])
-        db.commit()
-        db.refresh(search1)
-        
-        print("   ✅ 3 búsquedas de ejemplo creadas")
-        
-        # Crear algunos productos de ejemplo
-        products = [
-            Product(
-                search_id=search1.id,
-                vinted_id="prod_001",
-                title="Nike Air Max 90 - Como nuevas",
-                description="Zapatillas en perfecto estado, apenas usadas",
-                price=35.0,
-                currency="EUR",
-                brand="Nike",
-                size="42",
-                condition="Muy bueno",
-                url="https://www.vinted.es/items/12345",
-                image_url="https://images.vinted.net/placeholder.jpg",
-                seller_id="user_123",
-                seller_name="María",
-                seller_country="ES"
-            ),
-            Product(
-                search_id=search1.id,
-                vinted_id="prod_002",
-                title="Nike Air Max 95 - Negras y rojas",
-                description="Zapatillas deportivas en buen estado",
-                price=45.0,
-                currency="EUR",
-                brand="Nike",
-                size="43",
-                condition="Bueno",
-                url="https://www.vinted.es/items/12346",
-                seller_id="user_456",
-                seller_name="Carlos",
-                seller_country="ES"
-            ),
-            Product(
-                search_id=search2.id,
-                vinted_id="prod_003",
-                title="Camiseta vintage años 90 - Band tee",
-                description="Camiseta de banda de los 90, auténtica vintage",
-                price=18.0,
-                currency="EUR",
-                condition="Bueno",
-                url="https://www.vinted.es/items/12347",
-                seller_id="user_789",
-                seller_name="Laura",
-                seller_country="PT"
-            )
-        ]
-        
-        db.add_all(products)
-        db.commit()
-        
-        print("   ✅ 3 productos de ejemplo creados")
+    print("=" * 70)
+    print("🧪 PREPARANDO APLICACIÓN WEB")
+    print("=" * 70)
+
+    # 1. Inicializar base de datos
+    print("\n1️⃣ Inicializando base de datos...")
+    fingerprint = schema_fingerprint()
+    if fingerprint is not None and fingerprint == read_cached_fingerprint():
+        print("   ⏭️  Esquema sin cambios desde la última ejecución")
     else:
-        print("\n2️⃣ Ya existen datos en la base de datos")
-        print(f"   📊 Búsquedas: {existing_searches}")
-        print(f"   📦 Productos: {db.query(Product).count()}")
-
-except Exception as e:
-    print(f"\n❌ ERROR al crear datos: {e}")
-    db.rollback()
-finally:
-    db.close()
-
-print("\n" + "=" * 70)
-print("✅ APLICACIÓN LISTA PARA INICIAR")
-print("=" * 70)
-print("\n📝 Para iniciar la aplicación, ejecuta:")
-print("   python main.py")
-print("\n🌐 Una vez iniciada, accede a:")
-print("   • Dashboard:  http://localhost:8000")
-print("   • Búsquedas:  http://localhost:8000/searches")
-print("   • Productos:  http://localhost:8000/products")
-print("   • Ayuda:      http://localhost:8000/help")
-print("   • API Docs:   http://localhost:8000/docs")
-print("\n💡 Presiona Ctrl+C para detener el servidor cuando termines")
-print("=" * 70)
+        init_db()
+
+        # Guardar la huella ya con las tablas creadas
+        fingerprint = schema_fingerprint()
+        if fingerprint is not None:
+            try:
+                with open(SCHEMA_VERSION_FILE, "w", encoding="utf-8") as f:
+                    f.write(fingerprint)
+            except OSError:
+                pass
+
+    # 2. Crear datos de ejemplo si no existen
+    db = SessionLocal()
+    try:
+        # Verificar si ya hay datos (ambos contadores en una sola consulta)
+        existing_searches, existing_products = db.query(
+            select(func.count(Search.id)).scalar_subquery(),
+            select(func.count(Product.id)).scalar_subquery()
+        ).one()
+
+        if existing_searches == 0:
+            print("\n2️⃣ Creando datos de ejemplo...")
+
+            # Crear 3 búsquedas de ejemplo (un INSERT ... RETURNING para todas)
+            search_rows = [
+                dict(
+                    name="Zapatillas Nike Air Max",
+                    query="nike air max",
+                    price_from=20.0,
+                    price_to=50.0,
+                    interval_minutes=5,
+                    is_active=True,
+                    allowed_countries=["ES", "PT", "FR"]
+                ),
+                dict(
+                    name="Camisetas Vintage",
+                    query="camiseta vintage",
+                    price_from=5.0,
+                    price_to=20.0,
+                    interval_minutes=10,
+                    is_active=True
+                ),
+                dict(
+                    name="Pantalones Vaqueros Levis",
+                    query="levis 501",
+                    price_from=15.0,
+                    price_to=40.0,
+                    interval_minutes=15,
+                    is_active=False
+                ),
+            ]
+
+            search1_id, search2_id, _ = db.scalars(
+                insert(Search).returning(Search.id, sort_by_parameter_order=True),
+                search_rows
+            ).all()
+
+            print("   ✅ 3 búsquedas de ejemplo creadas")
+
+            # Crear algunos productos de ejemplo
+            product_rows = [
+                dict(
+                    search_id=search1_id,
+                    vinted_id="prod_001",
+                    title="Nike Air Max 90 - Como nuevas",
+                    description="Zapatillas en perfecto estado, apenas usadas",
+                    price=35.0,
+                    currency="EUR",
+                    brand="Nike",
+                    size="42",
+                    condition="Muy bueno",
+                    url="https://www.vinted.es/items/12345",
+                    image_url="https://images.vinted.net/placeholder.jpg",
+                    seller_id="user_123",
+                    seller_name="María",
+                    seller_country="ES"
+                ),
+                dict(
+                    search_id=search1_id,
+                    vinted_id="prod_002",
+                    title="Nike Air Max 95 - Negras y rojas",
+                    description="Zapatillas deportivas en buen estado",
+                    price=45.0,
+                    currency="EUR",
+                    brand="Nike",
+                    size="43",
+                    condition="Bueno",
+                    url="https://www.vinted.es/items/12346",
+                    seller_id="user_456",
+                    seller_name="Carlos",
+                    seller_country="ES"
+                ),
+                dict(
+                    search_id=search2_id,
+                    vinted_id="prod_003",
+                    title="Camiseta vintage años 90 - Band tee",
+                    description="Camiseta de banda de los 90, auténtica vintage",
+                    price=18.0,
+                    currency="EUR",
+                    condition="Bueno",
+                    url="https://www.vinted.es/items/12347",
+                    seller_id="user_789",
+                    seller_name="Laura",
+                    seller_country="PT"
+                ),
+            ]
+
+            for start in range(0, len(product_rows), INSERT_BATCH_SIZE):
+                db.execute(insert(Product), product_rows[start:start + INSERT_BATCH_SIZE])
+            db.commit()
+
+            print("   ✅ 3 productos de ejemplo creados")
+        else:
+            print("\n2️⃣ Ya existen datos en la base de datos")
+            print(f"   📊 Búsquedas: {existing_searches}")
+            print(f"   📦 Productos: {existing_products}")
+
+    except Exception as e:
+        print(f"\n❌ ERROR al crear datos: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+    print("\n" + "=" * 70)
+    print("✅ APLICACIÓN LISTA PARA INICIAR")
+    print("=" * 70)
+    print("\n📝 Para iniciar la aplicación, ejecuta:")
+    print("   python main.py")
+    print("\n🌐 Una vez iniciada, accede a:")
+    print("   • Dashboard:  http://localhost:8000")
+    print("   • Búsquedas:  http://localhost:8000/searches")
+    print("   • Productos:  http://localhost:8000/products")
+    print("   • Ayuda:      http://localhost:8000/help")
+    print("   • API Docs:   http://localhost:8000/docs")
+    print("\n💡 Presiona Ctrl+C para detener el servidor cuando termines")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()